@@ -0,0 +1,147 @@
+"""ASGI-приложение проекта.
+
+В Django 2.2 нет ни ASGI-обработчика, ни асинхронных представлений,
+поэтому чтение произведений, отзывов и комментариев (READ_ACTIONS
+вьюсетов из READ_VIEWS) обслуживает корутина read_view: запрос
+читается и ответ отправляется в цикле событий, а само представление
+с ORM выполняется в пуле из ASGI_READ_THREADS потоков. Поток занят
+только на время работы с базой, поэтому медленные клиенты его не
+держат, и один процесс обслуживает много соединений.
+Остальные запросы (запись, выгрузка, админка) проходят через обычный
+WSGI-обработчик в обертке asgiref.WsgiToAsgi; ответ после отдачи
+закрывает closing, иначе не срабатывает сигнал request_finished.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from django.conf import settings
+from django.core import signals
+from django.core.handlers.wsgi import WSGIHandler, get_script_name
+from django.urls import Resolver404, resolve, set_script_prefix
+
+from .views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+READ_VIEWS = (TitleViewSet, ReviewViewSet, CommentViewSet)
+READ_ACTIONS = ("list", "retrieve", "stats")
+READ_METHODS = ("GET", "HEAD")
+
+
+def is_read_request(scope):
+    """
+    GET или HEAD одного из READ_VIEWS с действием из READ_ACTIONS:
+    list, retrieve или stats.
+    """
+    if scope["type"] != "http" or scope["method"] not in READ_METHODS:
+        return False
+    try:
+        match = resolve(scope["path"])
+    except Resolver404:
+        return False
+    actions = getattr(match.func, "actions", {})
+    return (
+        getattr(match.func, "cls", None) in READ_VIEWS
+        and actions.get("get") in READ_ACTIONS
+    )
+
+
+def closing(application):
+    """
+    WSGI-приложение, которое закрывает ответ application после отдачи.
+    WsgiToAsgi из asgiref 3.2 не вызывает close() у ответа, поэтому
+    без обертки не приходит request_finished и не закрываются
+    соединения с базой (close_old_connections).
+    """
+
+    def wrapper(environ, start_response):
+        response = application(environ, start_response)
+        try:
+            yield from response
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+
+    return wrapper
+
+
+class ReadHandler(WSGIHandler):
+    """WSGIHandler, который возвращает ответ целиком для отправки из цикла."""
+
+    def respond(self, environ):
+        set_script_prefix(get_script_name(environ))
+        signals.request_started.send(sender=self.__class__, environ=environ)
+        request = self.request_class(environ)
+        response = self.get_response(request)
+        try:
+            headers = [
+                (name.encode("latin1"), value.encode("latin1"))
+                for name, value in response.items()
+            ]
+            headers.extend(
+                (b"set-cookie", cookie.output(header="").strip().encode())
+                for cookie in response.cookies.values()
+            )
+            body = b"".join(response)
+            if environ["REQUEST_METHOD"] == "HEAD":
+                body = b""
+            return response.status_code, headers, body
+        finally:
+            # Сигнал request_finished закрывает соединение с базой потока.
+            response.close()
+
+
+class Application:
+    def __init__(self):
+        self.handler = ReadHandler()
+        self.wsgi = WsgiToAsgi(closing(self.handler))
+        self.executor = ThreadPoolExecutor(
+            settings.ASGI_READ_THREADS, thread_name_prefix="asgi-read"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif is_read_request(scope):
+            await self.read_view(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def build_environ(self, scope, body):
+        instance = WsgiToAsgiInstance(self.handler)
+        instance.scope = scope
+        return instance.build_environ(scope, body)
+
+    async def read_view(self, scope, receive, send):
+        body = BytesIO()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.write(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body.seek(0)
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(
+            self.executor,
+            self.handler.respond,
+            self.build_environ(scope, body),
+        )
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers,
+        })
+        await send({"type": "http.response.body", "body": content})
@@ -0,0 +1,66 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from reviews.models import User
+from reviews.versions import get_version, version_key
+
+from .cache import cache_is_shared
+
+TOKEN_USER_KEY = "auth:token:{jti}"
+# from_db ожидает значения в порядке полей модели.
+CACHED_USER_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in (
+        "id", "username", "role", "is_staff", "is_superuser", "is_active"
+    )
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кешем пользователя по токену.
+    В кеше лежат только поля для проверки прав; остальные поля
+    User загружаются из базы при первом обращении.
+    Запись кеша привязана к версии пользователя, которую меняет
+    любое сохранение или удаление User (reviews.signals), и живет
+    не дольше AUTH_USER_CACHE_TTL секунд. С кешем в памяти процесса
+    версия в других воркерах не меняется, поэтому пользователь
+    тогда не кешируется.
+    """
+
+    def get_user(self, validated_token):
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if jti is None or user_id is None or not cache_is_shared():
+            return super().get_user(validated_token)
+
+        token_key = TOKEN_USER_KEY.format(jti=jti)
+        user_version_key = version_key(User, user_id)
+        found = cache.get_many([token_key, user_version_key])
+        cached = found.get(token_key)
+        if cached is not None and cached[0] == found.get(user_version_key):
+            return User.from_db(
+                router.db_for_read(User), CACHED_USER_FIELDS, cached[1]
+            )
+
+        version = get_version(User, user_id)
+        user = super().get_user(validated_token)
+        timeout = min(
+            validated_token["exp"] - int(time.time()),
+            settings.AUTH_USER_CACHE_TTL,
+        )
+        if timeout > 0:
+            cache.set(
+                token_key,
+                (
+                    version,
+                    [getattr(user, field) for field in CACHED_USER_FIELDS],
+                ),
+                timeout,
+            )
+        return user
@@ -0,0 +1,72 @@
+"""Кеш ответов для небольших и редко меняющихся списков.
+Ключ включает версию данных модели (reviews.versions), схему и хост
+(в ответе абсолютные ссылки next и previous) и параметры запроса,
+срок жизни задается настройкой LISTING_CACHE_TTL.
+Пока реплики могут отставать от изменения, список собирается по default
+(api.replicas). Счетчики попаданий и промахов хранятся в том же кеше
+и отдаются в /metrics (api.metrics)."""
+
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from reviews.versions import get_version
+
+from .replicas import read_from_primary_if_changed
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+LISTING_KEY = "listing:{label}:{version}:{origin}:{query}"
+COUNTER_KEY = "listing:{label}:{event}"
+HIT = "hits"
+MISS = "misses"
+
+
+def cache_is_shared():
+    """Общий ли кеш по умолчанию для всех процессов (см. api.checks)."""
+    return settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES
+
+
+def listing_cache_key(model, request, version):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return LISTING_KEY.format(
+        label=model._meta.label_lower,
+        version=version,
+        origin=f"{request.scheme}://{request.get_host()}",
+        query=query,
+    )
+
+
+def count_event(model, event):
+    key = COUNTER_KEY.format(label=model._meta.label_lower, event=event)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_listing_cache_stats(model):
+    """Попадания и промахи кеша списка модели."""
+    label = model._meta.label_lower
+    return {
+        event: cache.get(COUNTER_KEY.format(label=label, event=event), 0)
+        for event in (HIT, MISS)
+    }
+
+
+def get_cached_listing(model, request, build):
+    """Данные списка из кеша или из build(), с учетом счетчиков."""
+    version = get_version(model)
+    key = listing_cache_key(model, request, version)
+    data = cache.get(key)
+    if data is not None:
+        count_event(model, HIT)
+        return data
+    count_event(model, MISS)
+    read_from_primary_if_changed([version])
+    data = build()
+    cache.set(key, data, settings.LISTING_CACHE_TTL)
+    return data
@@ -0,0 +1,33 @@
+"""Проверки настроек, без которых API отдает устаревшие данные."""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .cache import cache_is_shared
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Версии данных (reviews.versions) для ETag и Last-Modified
+    (ConditionalReadMixin) и кеш списков (CachedListMixin) должны быть
+    общими для всех воркеров: иначе запись в одном процессе не видна
+    другим, и они бесконечно отвечают 304 или старым списком. В том же
+    кеше привязки пользователей к default после записи (api.replicas).
+    """
+    if cache_is_shared():
+        return []
+    backend = settings.CACHES["default"]["BACKEND"]
+    return [
+        Error(
+            f"Кеш {backend} не общий для процессов: условные запросы, "
+            "кеш списков и чтение с реплик будут отдавать устаревшие "
+            "данные.",
+            hint=(
+                "Укажите общий кеш в CACHE_BACKEND и CACHE_LOCATION, "
+                "например memcached (по умолчанию) или FileBasedCache "
+                "для локального запуска."
+            ),
+            id="api.E001",
+        )
+    ]
@@ -1,13 +1,18 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
     genre = filters.CharFilter(field_name='genre__slug')
     category = filters.CharFilter(field_name='category__slug')
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    name = filters.CharFilter(field_name='name', method='filter_name')
     year = filters.NumberFilter(field_name='year')
 
     class Meta:
         model = Title
         fields = ('name', 'year', 'category', 'genre')
+
+    def filter_name(self, queryset, name, value):
+        """Поиск по названию через индекс с сортировкой по релевантности."""
+        return search_titles(queryset, value)
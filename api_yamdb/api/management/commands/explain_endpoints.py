@@ -0,0 +1,225 @@
+"""Проверка планов запросов списков API через EXPLAIN.
+
+Для каждого списка (произведения с типичными фильтрами, отзывы,
+комментарии) строится тот же queryset, что и во вьюсете, и его первая
+страница прогоняется через EXPLAIN, на PostgreSQL - EXPLAIN ANALYZE
+(запрос выполняется). В плане ищутся полные проходы по таблицам
+и сортировки; для них предлагается составной индекс
+"поля фильтра + поля сортировки", если у модели такого еще нет.
+
+Значения фильтров берутся из базы: самые частые год, категория и жанр,
+произведение с наибольшим числом отзывов и отзыв с наибольшим числом
+комментариев. На маленькой базе планировщик может выбрать полный проход
+и при наличии индекса, поэтому проверять стоит на данных generate_data.
+"""
+
+import re
+
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory
+from rest_framework.request import Request
+from reviews.models import Category, Comment, Genre, Review, Title
+
+PLAN_PATTERNS = {
+    'postgresql': (
+        re.compile(r'Seq Scan on (\w+)'),
+        re.compile(r'\b(?:Incremental )?Sort  \('),
+    ),
+    'sqlite': (
+        re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! (?:USING|VIRTUAL))'),
+        re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY'),
+    ),
+}
+EXPLAIN_OPTIONS = {
+    'postgresql': {'analyze': True},
+    'sqlite': {},
+}
+INDEX_NAME_LENGTH = 30
+
+
+def most_common(queryset, field):
+    row = (
+        queryset.values(field)
+        .annotate(count=Count('pk'))
+        .order_by('-count', field)
+        .first()
+    )
+    return row and row[field]
+
+
+def endpoint_queryset(view_class, path, kwargs, params):
+    """Первая страница списка, как ее выбирает вьюсет."""
+    request = Request(RequestFactory().get(path, params))
+    view = view_class(
+        request=request,
+        args=(),
+        kwargs=kwargs,
+        action='list',
+        format_kwarg=None,
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    values_serializer = view.values_serializer_class
+    if values_serializer is not None:
+        queryset = queryset.prefetch_related(None).values(
+            *values_serializer.get_values_fields(
+                view.get_serializer_context()
+            )
+        )
+    limit = view.paginator.get_limit(request) or view.paginator.default_limit
+    return queryset[:limit]
+
+
+def index_fields(model, fields):
+    """Имена полей для models.Index; None, если это не поля модели."""
+    result = []
+    for name in fields:
+        if not isinstance(name, str):
+            return None
+        prefix, field_name = ('-', name[1:]) if name[0] == '-' else ('', name)
+        if field_name == 'pk':
+            field_name = model._meta.pk.name
+        try:
+            model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return None
+        result.append(prefix + field_name)
+    return result
+
+
+def is_covered(model, fields):
+    """Есть ли у модели индекс, который начинается с fields."""
+    if len(fields) == 1:
+        field = model._meta.get_field(fields[0].lstrip('-'))
+        if field.db_index or field.unique:
+            return True
+    return any(
+        index.fields[:len(fields)] == fields
+        for index in model._meta.indexes
+    )
+
+
+def index_name(model, fields):
+    stripped = [name.lstrip('-') for name in fields[:2]]
+    name = '_'.join([model._meta.model_name, *stripped, 'idx'])
+    return name[:INDEX_NAME_LENGTH]
+
+
+class Command(BaseCommand):
+    EMPTY_MESSAGE = 'Нет данных для проверки: заполните базу (generate_data).'
+    VENDOR_MESSAGE = 'EXPLAIN поддерживается только для {vendors}.'
+    OK_MESSAGE = '{url}: без полных проходов и сортировок.'
+    SCAN_MESSAGE = 'полный проход {table}'
+    SORT_MESSAGE = 'сортировка'
+    INDEX_MESSAGE = (
+        '    предлагаемый индекс для {model}: '
+        'models.Index(fields={fields}, name="{name}")'
+    )
+    DONE_MESSAGE = 'Проверено запросов: {total}, с замечаниями: {flagged}.'
+
+    help = 'EXPLAIN списков API с поиском полных проходов и сортировок'
+
+    def get_cases(self):
+        """(вьюсет, путь, kwargs, параметры, модель, поля фильтра)."""
+        title = Title.objects.order_by('-rating_count', 'pk').first()
+        if title is None:
+            raise CommandError(self.EMPTY_MESSAGE)
+        review_id = most_common(Comment.objects.all(), 'review_id')
+        review = (
+            Review.objects.filter(pk=review_id).first()
+            or Review.objects.filter(title=title).order_by('pk').first()
+        )
+        year = most_common(Title.objects.all(), 'year')
+        category = Category.objects.filter(
+            pk=most_common(Title.objects.all(), 'category_id')
+        ).first()
+        genre = Genre.objects.filter(
+            pk=most_common(Title.genre.through.objects.all(), 'genre_id')
+        ).first()
+
+        titles = '/api/v1/titles/'
+        cases = [
+            (TitleViewSet, titles, {}, {}, Title, []),
+            (TitleViewSet, titles, {}, {'year': year}, Title, ['year']),
+            (
+                TitleViewSet, titles, {}, {'name': title.name[:5]},
+                Title, None,
+            ),
+        ]
+        if category is not None:
+            cases.append((
+                TitleViewSet, titles, {}, {'category': category.slug},
+                Title, ['category'],
+            ))
+        if genre is not None:
+            # Фильтр через таблицу связи: индекс не предлагается.
+            cases.append((
+                TitleViewSet, titles, {}, {'genre': genre.slug},
+                Title, None,
+            ))
+        reviews = f'/api/v1/titles/{title.pk}/reviews/'
+        cases.append((
+            ReviewViewSet, reviews, {'title_id': title.pk}, {},
+            Review, ['title'],
+        ))
+        if review is not None:
+            cases.append((
+                CommentViewSet,
+                f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.pk}/comments/',
+                {'title_id': review.title_id, 'review_id': review.pk},
+                {},
+                Comment,
+                ['review'],
+            ))
+        return cases
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in PLAN_PATTERNS:
+            raise CommandError(
+                self.VENDOR_MESSAGE.format(vendors=', '.join(PLAN_PATTERNS))
+            )
+        scan_pattern, sort_pattern = PLAN_PATTERNS[vendor]
+        cases = self.get_cases()
+        flagged = 0
+        for view_class, path, kwargs, params, model, filters in cases:
+            query = '&'.join(f'{key}={value}' for key, value in params.items())
+            url = f'{path}?{query}' if query else path
+            page = endpoint_queryset(view_class, path, kwargs, params)
+            plan = page.explain(**EXPLAIN_OPTIONS[vendor])
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{url}\n{plan}')
+            problems = [
+                self.SCAN_MESSAGE.format(table=table)
+                for table in sorted(set(scan_pattern.findall(plan)))
+            ]
+            if sort_pattern.search(plan):
+                problems.append(self.SORT_MESSAGE)
+            if not problems:
+                self.stdout.write(self.OK_MESSAGE.format(url=url))
+                continue
+            flagged += 1
+            self.stdout.write(
+                self.style.WARNING(f'{url}: {", ".join(problems)}.')
+            )
+            if filters is None:
+                continue
+            fields = index_fields(
+                model,
+                [*filters, *(page.query.order_by or model._meta.ordering)],
+            )
+            if fields and not is_covered(model, fields):
+                self.stdout.write(
+                    self.INDEX_MESSAGE.format(
+                        model=model.__name__,
+                        fields=fields,
+                        name=index_name(model, fields),
+                    )
+                )
+        self.stdout.write(
+            self.DONE_MESSAGE.format(total=len(cases), flagged=flagged)
+        )
@@ -0,0 +1,266 @@
+"""Метрики запросов в формате Prometheus без внешних зависимостей.
+
+MetricsMiddleware для каждого вьюсета и действия (TitleViewSet.list,
+ReviewViewSet.create, ...) считает запросы, гистограмму времени ответа,
+число и время SQL-запросов и время сериализации (serializer.data
+и рендеринг ответа). Данные копятся в памяти
+процесса, а раз в METRICS_FLUSH_INTERVAL секунд снимок процесса
+кладется в кеш Django. Эндпоинт /metrics складывает снимки всех воркеров,
+поэтому для нескольких процессов нужен общий кеш (CACHE_BACKEND).
+Воркер, не писавший снимок дольше METRICS_WORKER_TTL секунд (например,
+перезапущенный), из списка воркеров удаляется. Без METRICS_TOKEN
+эндпоинт закрыт и отвечает 404.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import (HttpResponse, HttpResponseForbidden,
+                         HttpResponseNotFound)
+from reviews.models import Category, Genre
+
+from .cache import HIT, MISS, get_listing_cache_stats
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+WORKER_KEY = "metrics:worker:{pid}"
+# {pid: время последнего снимка}
+WORKERS_KEY = "metrics:heartbeats"
+UNRESOLVED = "unresolved"
+# Модели, списки которых кешируются (api.mixins.CachedListMixin)
+LISTING_CACHE_MODELS = (Category, Genre)
+
+
+class RequestMetrics:
+    """Счетчики одного запроса."""
+
+    def __init__(self):
+        self.view = UNRESOLVED
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += perf_counter() - started
+
+
+class Registry:
+    """Накопленные метрики процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+        self.requests = defaultdict(int)
+        self.buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.duration = defaultdict(float)
+        self.count = defaultdict(int)
+        self.queries = defaultdict(int)
+        self.sql_seconds = defaultdict(float)
+        self.serialization_seconds = defaultdict(float)
+
+    def observe(self, stats, status, seconds):
+        view = stats.view
+        with self.lock:
+            self.requests[(view, status)] += 1
+            self.count[view] += 1
+            self.duration[view] += seconds
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[view][index] += 1
+            self.queries[view] += stats.queries
+            self.sql_seconds[view] += stats.sql_seconds
+            self.serialization_seconds[view] += stats.serialization_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "buckets": {
+                    view: list(values) for view, values in self.buckets.items()
+                },
+                "duration": dict(self.duration),
+                "count": dict(self.count),
+                "queries": dict(self.queries),
+                "sql_seconds": dict(self.sql_seconds),
+                "serialization_seconds": dict(self.serialization_seconds),
+            }
+
+    def flush(self, force=False):
+        """Кладет снимок процесса в кеш не чаще раза в интервал."""
+        now = time.monotonic()
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if not force and now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        pid = os.getpid()
+        ttl = settings.METRICS_WORKER_TTL
+        cache.set(WORKER_KEY.format(pid=pid), self.snapshot(), ttl)
+        seen = time.time()
+        workers = {
+            worker: heartbeat
+            for worker, heartbeat in cache.get(WORKERS_KEY, {}).items()
+            if seen - heartbeat < ttl
+        }
+        workers[pid] = seen
+        cache.set(WORKERS_KEY, workers, ttl)
+
+
+registry = Registry()
+
+
+def view_label(view_func, method):
+    """Имя вьюсета и действия, например TitleViewSet.list."""
+    view_class = getattr(view_func, "cls", None)
+    actions = getattr(view_func, "actions", None)
+    if view_class is None:
+        return view_func.__name__
+    if actions:
+        action = actions.get(method.lower(), method.lower())
+        return f"{view_class.__name__}.{action}"
+    return f"{view_func.__name__}.{method.lower()}"
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.metrics = RequestMetrics()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(stats.sql_wrapper)
+                )
+            response = self.get_response(request)
+        registry.observe(
+            stats, response.status_code, perf_counter() - started
+        )
+        registry.flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics.view = view_label(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        """
+        Рендерит ответ DRF здесь, чтобы отнести время рендерера
+        к сериализации. Повторный render() в обработчике ничего не делает.
+        """
+        started = perf_counter()
+        response.render()
+        request.metrics.serialization_seconds += perf_counter() - started
+        return response
+
+
+def merged_snapshots():
+    """Сумма снимков всех живых воркеров."""
+    registry.flush(force=True)
+    workers = cache.get(WORKERS_KEY, {})
+    keys = [WORKER_KEY.format(pid=pid) for pid in workers]
+    merged = defaultdict(lambda: defaultdict(int))
+    for snapshot in cache.get_many(keys).values():
+        for metric, values in snapshot.items():
+            for label, value in values.items():
+                if isinstance(value, list):
+                    current = merged[metric].get(label) or [0] * len(value)
+                    merged[metric][label] = [
+                        a + b for a, b in zip(current, value)
+                    ]
+                else:
+                    merged[metric][label] += value
+    return merged
+
+
+def render(snapshot):
+    lines = [
+        "# HELP yamdb_requests_total Количество запросов.",
+        "# TYPE yamdb_requests_total counter",
+    ]
+    for (view, status), value in sorted(snapshot["requests"].items()):
+        lines.append(
+            f'yamdb_requests_total{{view="{view}",status="{status}"}} {value}'
+        )
+
+    lines += [
+        "# HELP yamdb_request_duration_seconds Время ответа.",
+        "# TYPE yamdb_request_duration_seconds histogram",
+    ]
+    for view, buckets in sorted(snapshot["buckets"].items()):
+        for bound, value in zip(DURATION_BUCKETS, buckets):
+            lines.append(
+                "yamdb_request_duration_seconds_bucket"
+                f'{{view="{view}",le="{bound}"}} {value}'
+            )
+        lines += [
+            "yamdb_request_duration_seconds_bucket"
+            f'{{view="{view}",le="+Inf"}} {snapshot["count"][view]}',
+            "yamdb_request_duration_seconds_sum"
+            f'{{view="{view}"}} {snapshot["duration"][view]}',
+            "yamdb_request_duration_seconds_count"
+            f'{{view="{view}"}} {snapshot["count"][view]}',
+        ]
+
+    for metric, name, description in (
+        ("queries", "yamdb_sql_queries_total", "Количество SQL-запросов."),
+        (
+            "sql_seconds",
+            "yamdb_sql_duration_seconds_total",
+            "Время SQL-запросов.",
+        ),
+        (
+            "serialization_seconds",
+            "yamdb_serialization_duration_seconds_total",
+            "Время сериализации ответа.",
+        ),
+    ):
+        lines += [
+            f"# HELP {name} {description}",
+            f"# TYPE {name} counter",
+        ]
+        for view, value in sorted(snapshot[metric].items()):
+            lines.append(f'{name}{{view="{view}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def render_listing_cache():
+    """Попадания и промахи кеша списков (api.cache): общие счетчики."""
+    lines = [
+        "# HELP yamdb_listing_cache_total Обращения к кешу списков.",
+        "# TYPE yamdb_listing_cache_total counter",
+    ]
+    for model in LISTING_CACHE_MODELS:
+        stats = get_listing_cache_stats(model)
+        for event in (HIT, MISS):
+            lines.append(
+                "yamdb_listing_cache_total"
+                f'{{model="{model._meta.label_lower}",event="{event}"}} '
+                f"{stats[event]}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """Метрики всех воркеров в текстовом формате Prometheus."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponseNotFound()
+    if request.META.get("HTTP_AUTHORIZATION") != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render(merged_snapshots()) + render_listing_cache(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
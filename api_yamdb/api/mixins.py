@@ -1,9 +1,140 @@
+from hashlib import md5
+from time import perf_counter
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
+from reviews.versions import get_versions, version_timestamp
+
+from .cache import get_cached_listing
+from .replicas import read_from_primary_if_changed
 
 
 class CreateDestroyListMixin(
     CreateModelMixin, ListModelMixin, DestroyModelMixin, GenericViewSet
 ):
     pass
+
+
+class SerializationMetricsMixin:
+    """Добавляет время serializer.data в метрики запроса (api.metrics)."""
+
+    timed_serializer_classes = {}
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if hasattr(self.request, "metrics"):
+            serializer.__class__ = self.timed_serializer_class(
+                serializer.__class__
+            )
+        return serializer
+
+    @classmethod
+    def timed_serializer_class(cls, serializer_class):
+        timed = cls.timed_serializer_classes.get(serializer_class)
+        if timed is None:
+            timed = cls.timed_serializer_classes[serializer_class] = type(
+                serializer_class.__name__,
+                (TimedDataMixin, serializer_class),
+                {},
+            )
+        return timed
+
+
+class TimedDataMixin:
+    @property
+    def data(self):
+        started = perf_counter()
+        data = super().data
+        self.context["request"].metrics.serialization_seconds += (
+            perf_counter() - started
+        )
+        return data
+
+
+class ValuesListMixin:
+    """
+    list через values(): страница выбирается словарями и собирается
+    в ответ сериализатором values_serializer_class (api.serializers
+    .ValuesSerializer) того же вида, что и обычный serializer_class.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        context = self.get_serializer_context()
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*serializer_class.get_values_fields(context))
+        )
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        started = perf_counter()
+        data = serializer_class(rows, context).data
+        if hasattr(request, "metrics"):
+            request.metrics.serialization_seconds += (
+                perf_counter() - started
+            )
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class CachedListMixin:
+    """Отдает list из кеша, пока не изменились данные модели."""
+
+    def list(self, request, *args, **kwargs):
+        data = get_cached_listing(
+            self.get_queryset().model,
+            request,
+            lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            ).data,
+        )
+        return Response(data)
+
+
+class ConditionalReadMixin:
+    """
+    ETag и Last-Modified для list и retrieve по версиям данных.
+    Если данные не менялись, отвечает 304 до выборки и сериализации.
+    По умолчанию учитывается версия всей модели queryset; наследник
+    может вернуть другие пары (модель, scope) в get_version_scopes.
+    """
+
+    def get_version_scopes(self):
+        return ((self.queryset.model, None),)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, action, request, *args, **kwargs):
+        versions = get_versions(*self.get_version_scopes())
+        etag = quote_etag(
+            md5(
+                "|".join([request.get_full_path(), *versions]).encode()
+            ).hexdigest()
+        )
+        last_modified = int(max(map(version_timestamp, versions)))
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            read_from_primary_if_changed(versions)
+            response = action(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,245 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from reviews.counts import estimated_count
+
+COUNT_KEY = "pagination:count:{digest}"
+
+
+class LimitOffsetKeysetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination с опциональным режимом курсора.
+    Если в запросе есть параметр cursor (в том числе пустой),
+    страница выбирается по ключу из полей view.keyset_ordering,
+    а не через OFFSET, и COUNT(*) не выполняется.
+    NULL считается больше любого значения, как в PostgreSQL.
+
+    Без курсора count точный, только пока строк не больше
+    COUNT_EXACT_LIMIT; дальше он приблизительный (см. count_rows),
+    о чем говорит count_approximate в ответе.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if not self.keyset_mode:
+            return self.paginate_offset(queryset, request)
+
+        self.request = request
+        self.limit = self.get_limit(request) or self.default_limit
+        self.model = queryset.model
+        self.ordering = self.get_keyset_ordering(view)
+        values, reverse = self.decode_cursor(request)
+
+        ordering = [
+            (name, descending != reverse)
+            for name, descending in self.ordering
+        ]
+        if values is not None:
+            queryset = queryset.filter(self.after(ordering, values))
+        queryset = queryset.order_by(
+            *(self.order_expression(name, desc) for name, desc in ordering)
+        )
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = page
+        return page
+
+    def paginate_offset(self, queryset, request):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count, self.count_approximate = self.count_rows(queryset)
+        self.offset = self.get_offset(request)
+        self.request = request
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if not self.count_approximate:
+            if self.count == 0 or self.offset > self.count:
+                return []
+            return list(queryset[self.offset:self.offset + self.limit])
+
+        # Приблизительный count может разойтись с таблицей, поэтому
+        # следующая страница определяется по лишней строке, а count
+        # подправляется так, чтобы ссылки next и previous были верны.
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        if len(page) > self.limit:
+            self.count = max(self.count, self.offset + self.limit + 1)
+        elif page:
+            self.count = self.offset + len(page)
+            self.count_approximate = False
+        return page[:self.limit]
+
+    def count_rows(self, queryset):
+        """
+        (count, приблизительный ли он). До COUNT_EXACT_LIMIT строк -
+        точный подсчет с LIMIT; больше - оценка PostgreSQL для запроса
+        без фильтров (reviews.counts) или точный COUNT(*), сохраненный
+        в кеше на COUNT_CACHE_TTL секунд.
+        """
+        limit = settings.COUNT_EXACT_LIMIT
+        count = queryset.order_by()[:limit + 1].count()
+        if count <= limit:
+            return count, False
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return estimate, True
+        key = COUNT_KEY.format(
+            digest=md5(str(queryset.query).encode()).hexdigest()
+        )
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.COUNT_CACHE_TTL)
+        return count, True
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return Response(OrderedDict([
+                ("count", self.count),
+                ("count_approximate", self.count_approximate),
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]))
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_keyset_ordering(self, view):
+        """Порядок ключа: ('-rating', 'name', 'pk') -> [(поле, desc)]."""
+        return [
+            (name.lstrip("-"), name.startswith("-"))
+            for name in view.keyset_ordering
+        ]
+
+    def get_field(self, name):
+        if name == "pk":
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def order_expression(self, name, descending):
+        if not self.get_field(name).null:
+            return F(name).desc() if descending else F(name).asc()
+        if descending:
+            return F(name).desc(nulls_first=True)
+        return F(name).asc(nulls_last=True)
+
+    def after(self, ordering, values):
+        """
+        Условие 'строго после ключа values' для порядка ordering.
+        OR-цепочка по всем полям сама по себе не дает базе границы
+        диапазона в индексе, поэтому к ней добавляется избыточное
+        условие на первое поле (not_before).
+        """
+        condition = Q(pk__in=[])
+        for (name, descending), value in reversed(
+            list(zip(ordering, values))
+        ):
+            condition = self.strictly_after(name, descending, value) | (
+                self.equal(name, value) & condition
+            )
+        (name, descending), value = ordering[0], values[0]
+        return self.not_before(name, descending, value) & condition
+
+    def not_before(self, name, descending, value):
+        """Первое поле не раньше value: граница диапазона для индекса."""
+        if value is None:
+            # NULL - первые при убывании и последние при возрастании.
+            if descending:
+                return Q()
+            return Q(**{f"{name}__isnull": True})
+        if descending:
+            return Q(**{f"{name}__lte": value})
+        condition = Q(**{f"{name}__gte": value})
+        if self.get_field(name).null:
+            condition |= Q(**{f"{name}__isnull": True})
+        return condition
+
+    @staticmethod
+    def strictly_after(name, descending, value):
+        if value is None:
+            return Q(pk__in=[]) if not descending else Q(
+                **{f"{name}__isnull": False}
+            )
+        if descending:
+            return Q(**{f"{name}__lt": value})
+        return Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+
+    @staticmethod
+    def equal(name, value):
+        if value is None:
+            return Q(**{f"{name}__isnull": True})
+        return Q(**{name: value})
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # Строка values(): ключ читается из объекта модели,
+            # собранного только из полей ключа.
+            obj = self.model(**{
+                self.get_field(name).attname: obj[self.get_field(name).attname]
+                for name, _ in self.ordering
+            })
+        values = [
+            self.get_field(name).value_to_string(obj)
+            if getattr(obj, name) is not None else None
+            for name, _ in self.ordering
+        ]
+        payload = json.dumps({"v": values, "r": reverse})
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            values = [
+                self.get_field(name).to_python(value)
+                if value is not None else None
+                for (name, _), value in zip(self.ordering, payload["v"])
+            ]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return values, bool(payload["r"])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,49 @@
+"""JSONParser на orjson, если он установлен.
+
+orjson читает только UTF-8, строже стандартного json (например,
+к неполным суррогатным парам) и превращает целые больше 64 бит во float.
+Поэтому при другой кодировке, при длинных числах и при любой ошибке
+orjson тело разбирает стандартный JSONParser: результат и текст ошибок
+те же, что у rest_framework.parsers.JSONParser.
+"""
+
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Целое из 19 и более цифр может не поместиться в 64 бита. Тело
+# переводится в строку из "0" на месте цифр и пробелов на месте остального:
+# так поиск быстрее регулярного выражения. Совпадение внутри строки
+# лишь отправляет тело в стандартный json.
+DIGITS_ONLY = bytes(
+    ord("0") if chr(byte) in "0123456789" else ord(" ")
+    for byte in range(256)
+)
+LONG_NUMBER = b"0" * 19
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            "encoding", settings.DEFAULT_CHARSET
+        )
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS_ONLY):
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context
+            )
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context
+            )
@@ -0,0 +1,62 @@
+"""JSONRenderer на orjson, если он установлен.
+
+Ответ побайтно совпадает с rest_framework.renderers.JSONRenderer:
+те же компактные разделители, UTF-8 без экранирования, \\u2028 и \\u2029
+экранируются, даты и прочие нестандартные типы проходят через
+encoder_class. Во всех случаях, где orjson пишет иначе (отступы,
+ensure_ascii, целые больше 64 бит, ключи не строки, числа с плавающей
+точкой в экспоненциальной записи), ответ строится стандартным json.
+NaN и бесконечности orjson пишет как null, а не отвергает.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Числа с экспонентой и вида 0.0000... orjson и json пишут по-разному.
+# Для поиска ответ переводится в строку, где цифры заменены на "0",
+# "e", "-" и "." сохранены, а остальное заменено пробелами: так поиск
+# быстрее регулярного выражения. Совпадение внутри строки лишь
+# отправляет ответ в стандартный json.
+FLOAT_CHARS = bytes(
+    ord("0") if chr(byte) in "0123456789"
+    else byte if chr(byte) in "e-." else ord(" ")
+    for byte in range(256)
+)
+INEXACT_FLOATS = (b"0e0", b"0e-", b"0.0000")
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                ),
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        float_chars = ret.translate(FLOAT_CHARS)
+        if any(pattern in float_chars for pattern in INEXACT_FLOATS):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(LINE_SEPARATOR, b"\\u2028").replace(
+            PARAGRAPH_SEPARATOR, b"\\u2029"
+        )
@@ -0,0 +1,111 @@
+"""Чтение с реплик базы данных.
+
+ReplicaMiddleware отмечает безопасные запросы (GET, HEAD, OPTIONS),
+и ReplicaRouter отправляет их чтение на одну из реплик
+DATABASE_REPLICAS, выбранную на весь запрос. Запись, небезопасные
+запросы и код вне запросов (команды, рассылка) работают с default.
+
+После небезопасного запроса пользователь на REPLICA_PIN_SECONDS
+привязывается к default, чтобы сразу видеть свои изменения, даже если
+реплика отстает. Пользователь определяется по JWT без обращения к базе,
+а привязка хранится в кеше Django, поэтому для нескольких процессов
+нужен общий кеш (CACHE_BACKEND, проверка api.E001).
+
+Версии данных (reviews.versions) меняются при записи в default. Ответ
+с ETag или из кеша списков, собранный по реплике, которая еще не
+получила изменение, сохранил бы старые строки под новой версией.
+Поэтому в течение REPLICA_PIN_SECONDS после изменения такие ответы
+читают данные из default (read_from_primary_if_changed).
+"""
+
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from reviews.versions import version_timestamp
+
+PIN_KEY = "replicas:pin:{user_id}"
+
+state = threading.local()
+
+
+def token_user_id(request):
+    """
+    id пользователя из заголовка Authorization или None. Ошибки
+    заголовка ("Bearer" без токена, лишние части) и токена здесь
+    не важны: их вернет аутентификация DRF, а запрос считается анонимным.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if not header:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def pin_to_primary(user_id):
+    cache.set(
+        PIN_KEY.format(user_id=user_id), True, settings.REPLICA_PIN_SECONDS
+    )
+
+
+def is_pinned(user_id):
+    return bool(cache.get(PIN_KEY.format(user_id=user_id)))
+
+
+def read_from_primary_if_changed(versions):
+    """
+    Переключает остаток запроса на default, если данные с версиями
+    versions менялись меньше REPLICA_PIN_SECONDS назад.
+    """
+    if getattr(state, "read_db", None) is None:
+        return
+    changed = max(map(version_timestamp, versions))
+    if time.time() - changed < settings.REPLICA_PIN_SECONDS:
+        state.read_db = None
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return self.get_response(request)
+        user_id = token_user_id(request)
+        safe = request.method in SAFE_METHODS
+        if safe and (user_id is None or not is_pinned(user_id)):
+            state.read_db = random.choice(replicas)
+        try:
+            return self.get_response(request)
+        finally:
+            state.read_db = None
+            if not safe and user_id is not None:
+                pin_to_primary(user_id)
+
+
+class ReplicaRouter:
+    """Чтение безопасных запросов - с реплики, остальное - с default."""
+
+    def db_for_read(self, model, **hints):
+        return getattr(state, "read_db", None) or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -1,8 +1,16 @@
-from django.shortcuts import get_object_or_404
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, connections, transaction
+from django.db.models import prefetch_related_objects
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from rest_framework.relations import SlugRelatedField
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from rest_framework.relations import ManyRelatedField, SlugRelatedField
+from rest_framework.settings import api_settings
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, Title, TitleStats, User)
 from reviews.validators import RegexUsernameValidator, validate_username_not_me
+from reviews.versions import bump_version
 
 from api_yamdb.settings import CONFIRMATION_CODE_LENGTH
 
@@ -77,12 +85,46 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
+def stats_requested(request):
+    """Нужна ли статистика отзывов в ответе (?stats=1)."""
+    return request is not None and request.query_params.get(
+        "stats"
+    ) in ("1", "true")
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики отзывов произведения."""
+
+    count = serializers.SerializerMethodField()
+    scores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = (
+            "count",
+            "scores",
+            "last_review_date",
+        )
+
+    def get_count(self, stats):
+        return sum(stats.histogram.values())
+
+    def get_scores(self, stats):
+        return {
+            str(score): count for score, count in stats.histogram.items()
+        }
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
-    """Сериализатор для безопасных запросов по произведениям."""
+    """
+    Сериализатор для безопасных запросов по произведениям.
+    Поле stats выводится только с параметром запроса ?stats=1.
+    """
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
     rating = serializers.IntegerField(read_only=True)
+    stats = TitleStatsSerializer(read_only=True)
 
     class Meta:
         model = Title
@@ -94,9 +136,15 @@ class TitleReadSerializer(serializers.ModelSerializer):
             "genre",
             "category",
             "rating",
+            "stats",
         )
         read_only_fields = ("__all__",)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not stats_requested(self.context.get("request")):
+            self.fields.pop("stats")
+
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для небезопасных запросов по произведениям."""
@@ -120,22 +168,67 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         )
 
 
+class LeaderboardTitleSerializer(serializers.ModelSerializer):
+    """Произведение в топе."""
+
+    rating = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Title
+        fields = (
+            "id",
+            "name",
+            "year",
+            "rating",
+            "rating_count",
+        )
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Место в топе категории или жанра."""
+
+    title = LeaderboardTitleSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = (
+            "position",
+            "weighted_rating",
+            "title",
+        )
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    """Топ категории или жанра: group - сама категория или жанр."""
+
+    kind = serializers.CharField()
+    group = CategorySerializer()
+    min_votes = serializers.IntegerField()
+    refreshed_at = serializers.DateTimeField()
+    results = LeaderboardEntrySerializer(many=True)
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для запросов по обзорам."""
 
     author = SlugRelatedField(slug_field="username", read_only=True)
 
-    def validate(self, data):
-        """Проверка, что это первый отзыв пользователя на произведение."""
-        if self.context.get("request").method != "POST":
-            return data
-        title_id = self.context.get("view").kwargs.get("title_id")
-        title = get_object_or_404(Title, id=title_id)
-        user = self.context.get("request").user
-        message = "Вы уже оставляли отзыв на это произведение."
-        if Review.objects.filter(title=title, author=user).exists():
-            raise serializers.ValidationError(message)
-        return data
+    def create(self, validated_data):
+        """
+        Создание отзыва. Повторный отзыв пользователя на произведение
+        отсекает ограничение author_title_connection, без отдельного запроса.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Вы уже оставляли отзыв на это произведение."
+                    ]
+                }
+            )
 
     class Meta:
         model = Review
@@ -161,3 +254,346 @@ class CommentSerializer(serializers.ModelSerializer):
             "author",
             "pub_date",
         )
+
+
+class BatchSlugRelatedField(SlugRelatedField):
+    """
+    SlugRelatedField для пакетной записи: объекты ищутся в словаре,
+    который BulkListSerializer загружает одним запросом на всю пачку.
+    """
+
+    def to_internal_value(self, data):
+        try:
+            return self.root.slug_lookups[self][smart_str(data)]
+        except KeyError:
+            self.fail(
+                "does_not_exist",
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Пакетное создание объектов: ссылки BatchSlugRelatedField разрешаются
+    одним запросом на поле, строки пишутся через bulk_create в одной
+    транзакции, а ошибки возвращаются списком - по одной на элемент.
+    """
+
+    max_items = 1000
+
+    def batch_fields(self):
+        for name, field in self.child.fields.items():
+            if isinstance(field, ManyRelatedField):
+                field = field.child_relation
+            if isinstance(field, BatchSlugRelatedField):
+                yield name, field
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.max_items:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f"Не больше {self.max_items} элементов за запрос."
+                    ]
+                }
+            )
+        if isinstance(data, list):
+            self.preload(data)
+        return super().to_internal_value(data)
+
+    def preload(self, data):
+        """Загружает объекты всех ссылок пачки, по запросу на поле."""
+        self.slug_lookups = {}
+        for name, field in self.batch_fields():
+            model = field.get_queryset().model
+            model_field = (
+                model._meta.pk if field.slug_field == "pk"
+                else model._meta.get_field(field.slug_field)
+            )
+            values = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                for slug in value if isinstance(value, list) else [value]:
+                    try:
+                        values.add(model_field.to_python(slug))
+                    except (TypeError, ValueError, DjangoValidationError):
+                        pass
+            values.discard(None)
+            self.slug_lookups[field] = {
+                smart_str(getattr(obj, field.slug_field)): obj
+                for obj in field.get_queryset().filter(
+                    **{f"{field.slug_field}__in": values}
+                )
+            }
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        many_fields = [
+            name for name, field in self.child.fields.items()
+            if isinstance(field, ManyRelatedField)
+        ]
+        objects = [
+            model(**{
+                name: value for name, value in attrs.items()
+                if name not in many_fields
+            })
+            for attrs in validated_data
+        ]
+        with transaction.atomic():
+            model.objects.bulk_create(objects)
+            self.assign_pks(model, objects)
+            for name in many_fields:
+                relation = getattr(model, name)
+                relation.through.objects.bulk_create([
+                    relation.through(**{
+                        relation.field.m2m_field_name(): obj,
+                        relation.field.m2m_reverse_field_name(): related,
+                    })
+                    for obj, attrs in zip(objects, validated_data)
+                    for related in attrs[name]
+                ])
+        bump_version(model)
+        if many_fields:
+            prefetch_related_objects(objects, *many_fields)
+        return objects
+
+    @staticmethod
+    def assign_pks(model, objects):
+        """
+        bulk_create заполняет id только на PostgreSQL. На других базах
+        id - последние len(objects) строк: транзакция после INSERT
+        держит блокировку записи, и чужих строк среди них нет.
+        """
+        connection = connections[model.objects.db]
+        if connection.features.can_return_ids_from_bulk_insert:
+            return
+        pks = model.objects.order_by("-pk").values_list("pk", flat=True)
+        for obj, pk in zip(objects, reversed(pks[:len(objects)])):
+            obj.pk = pk
+
+
+class TitleBulkListSerializer(BulkListSerializer):
+    """Пакетное создание произведений с пустой статистикой отзывов."""
+
+    def create(self, validated_data):
+        titles = super().create(validated_data)
+        TitleStats.objects.bulk_create(
+            TitleStats(title=title) for title in titles
+        )
+        return titles
+
+
+class TitleBulkSerializer(TitleWriteSerializer):
+    """Сериализатор для пакетного создания произведений."""
+
+    category = BatchSlugRelatedField(
+        queryset=Category.objects.all(), slug_field="slug"
+    )
+    genre = BatchSlugRelatedField(
+        queryset=Genre.objects.all(), slug_field="slug", many=True
+    )
+
+    class Meta(TitleWriteSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
+
+
+class ReviewBulkListSerializer(BulkListSerializer):
+    """Пакетное создание отзывов с пересчетом рейтингов произведений."""
+
+    def preload(self, data):
+        super().preload(data)
+        titles = self.slug_lookups[self.child.fields["title"]].values()
+        authors = self.slug_lookups[self.child.fields["author"]].values()
+        self.existing_pairs = set(
+            Review.objects.filter(title__in=titles, author__in=authors)
+            .values_list("title_id", "author_id")
+        )
+
+    def create(self, validated_data):
+        try:
+            reviews = super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Часть отзывов уже существует."
+                    ]
+                }
+            )
+        title_ids = {review.title_id for review in reviews}
+        titles = Title.objects.filter(pk__in=title_ids)
+        Title.refresh_ratings(titles)
+        TitleStats.refresh(titles)
+        for title_id in title_ids:
+            bump_version(Review, title_id)
+        bump_version(Title)
+        return reviews
+
+
+class ReviewBulkSerializer(serializers.ModelSerializer):
+    """Сериализатор для пакетного создания отзывов от имени авторов."""
+
+    title = BatchSlugRelatedField(
+        queryset=Title.objects.only("id"), slug_field="pk"
+    )
+    author = BatchSlugRelatedField(
+        queryset=User.objects.only("id", "username"), slug_field="username"
+    )
+
+    def validate(self, attrs):
+        pair = (attrs["title"].pk, attrs["author"].pk)
+        pairs = self.parent.existing_pairs
+        if pair in pairs:
+            raise serializers.ValidationError(
+                "Автор уже оставлял отзыв на это произведение."
+            )
+        pairs.add(pair)
+        return attrs
+
+    class Meta:
+        model = Review
+        fields = (
+            "id",
+            "title",
+            "author",
+            "text",
+            "score",
+            "pub_date",
+        )
+        list_serializer_class = ReviewBulkListSerializer
+
+
+class ValuesSerializer:
+    """
+    Сериализатор списков только для чтения: принимает строки values()
+    и собирает словари того же вида, что и ModelSerializer, не создавая
+    объекты моделей и не обходя поля на каждую строку.
+    Наследник задает fields - {поле ответа: ключ строки values()} -
+    и datetime_fields или, для вложенных данных, values_fields
+    и свой to_representation(row).
+    """
+
+    fields = {}
+    datetime_fields = ()
+    values_fields = ()
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def get_values_fields(cls, context):
+        return cls.values_fields or tuple(cls.fields.values())
+
+    def datetime(self, value):
+        """Дата в том же формате и часовом поясе, что у DateTimeField."""
+        return self.datetime_field.to_representation(value)
+
+    def to_representation(self, row):
+        data = {name: row[key] for name, key in self.fields.items()}
+        for name in self.datetime_fields:
+            data[name] = self.datetime(data[name])
+        return data
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Список произведений в формате TitleReadSerializer."""
+
+    values_fields = (
+        "id",
+        "name",
+        "year",
+        "description",
+        "category__name",
+        "category__slug",
+        "rating",
+    )
+
+    stats_values_fields = tuple(
+        f"stats__{TitleStats.score_field(score)}"
+        for score in TitleStats.SCORES
+    ) + ("stats__last_review_date",)
+
+    def __init__(self, rows, context=None):
+        super().__init__(rows, context)
+        self.include_stats = stats_requested(self.context.get("request"))
+        self.genres = defaultdict(list)
+        if not rows:
+            return
+        links = Title.genre.through.objects.filter(
+            title_id__in=[row["id"] for row in rows]
+        ).order_by("pk").values_list("title_id", "genre__name", "genre__slug")
+        for title_id, name, slug in links:
+            self.genres[title_id].append({"name": name, "slug": slug})
+
+    @classmethod
+    def get_values_fields(cls, context):
+        if stats_requested(context.get("request")):
+            return cls.values_fields + cls.stats_values_fields
+        return cls.values_fields
+
+    def stats(self, row):
+        """Статистика в формате TitleStatsSerializer или None без записи."""
+        histogram = {
+            score: row[f"stats__{TitleStats.score_field(score)}"]
+            for score in TitleStats.SCORES
+        }
+        if None in histogram.values():
+            return None
+        return {
+            "count": sum(histogram.values()),
+            "scores": {
+                str(score): count for score, count in histogram.items()
+            },
+            "last_review_date": self.datetime(row["stats__last_review_date"]),
+        }
+
+    def to_representation(self, row):
+        title = {
+            "id": row["id"],
+            "name": row["name"],
+            "year": row["year"],
+            "description": row["description"],
+            "genre": self.genres.get(row["id"], []),
+            "category": {
+                "name": row["category__name"],
+                "slug": row["category__slug"],
+            } if row["category__slug"] is not None else None,
+            "rating": (
+                int(row["rating"]) if row["rating"] is not None else None
+            ),
+        }
+        if self.include_stats:
+            title["stats"] = self.stats(row)
+        return title
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Список отзывов в формате ReviewSerializer."""
+
+    fields = {
+        "id": "id",
+        "text": "text",
+        "author": "author__username",
+        "score": "score",
+        "pub_date": "pub_date",
+    }
+    datetime_fields = ("pub_date",)
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Список комментариев в формате CommentSerializer."""
+
+    fields = {
+        "id": "id",
+        "text": "text",
+        "author": "author__username",
+        "pub_date": "pub_date",
+    }
+    datetime_fields = ("pub_date",)
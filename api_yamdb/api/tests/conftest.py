@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+CATALOG_SIZE = 25
+LOCAL_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """Тесты идут в одном процессе, общий кеш (memcached) им не нужен."""
+    settings.CACHES = LOCAL_CACHES
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Кеш, общий для процессов, как memcached в Docker."""
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+
+
+def client_for(user=None):
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+    return client
+
+
+@pytest.fixture
+def admin(db):
+    return User.objects.create(
+        username="admin", email="admin@yamdb.test", role=User.ADMIN
+    )
+
+
+@pytest.fixture
+def catalog(db):
+    """
+    CATALOG_SIZE произведений с категорией и двумя жанрами; на первое
+    у каждого автора есть отзыв, на первый отзыв - комментарии всех
+    авторов.
+    """
+    category = Category.objects.create(name="Книги", slug="books")
+    genres = [
+        Genre.objects.create(name="Драма", slug="drama"),
+        Genre.objects.create(name="Роман", slug="novel"),
+    ]
+    titles = []
+    for number in range(CATALOG_SIZE):
+        title = Title.objects.create(
+            name=f"Произведение {number}", year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    authors = [
+        User.objects.create(username=f"author{number}",
+                            email=f"author{number}@yamdb.test")
+        for number in range(CATALOG_SIZE)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text="Отзыв",
+            score=number % 10 + 1,
+        )
+        for number, author in enumerate(authors)
+    ]
+    for author in authors:
+        Comment.objects.create(
+            review=reviews[0], author=author, text="Комментарий"
+        )
+    return {
+        "category": category,
+        "genres": genres,
+        "titles": titles,
+        "authors": authors,
+        "reviews": reviews,
+    }
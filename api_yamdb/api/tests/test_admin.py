@@ -0,0 +1,37 @@
+"""Админка больших таблиц (reviews.admin)."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def test_title_decade_filter(catalog, admin_client):
+    url = "/admin/reviews/title/"
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, {"decade": "2000"})
+    assert response.status_code == 200
+    assert len(response.context["cl"].result_list) == len(catalog["titles"])
+    assert not any("DISTINCT" in query["sql"] for query in queries)
+    response = admin_client.get(url, {"decade": "1990"})
+    assert len(response.context["cl"].result_list) == 0
+
+
+def test_review_autocomplete_searches_pk(catalog, admin_client):
+    review = catalog["reviews"][5]
+    response = admin_client.get(
+        "/admin/reviews/review/autocomplete/", {"term": str(review.pk)}
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [
+        str(review.pk)
+    ]
+
+
+def test_review_changelist_searches_title_id(catalog, admin_client):
+    title = catalog["titles"][0]
+    response = admin_client.get(
+        "/admin/reviews/review/", {"q": str(title.pk)}
+    )
+    assert response.status_code == 200
+    assert {
+        review.pk for review in response.context["cl"].result_list
+    } == {review.pk for review in catalog["reviews"]}
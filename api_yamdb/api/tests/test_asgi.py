@@ -0,0 +1,56 @@
+import asyncio
+
+from api.asgi import Application
+from django.core import signals
+
+
+def call(application, scope, body=b""):
+    """Прогоняет один HTTP-запрос через ASGI-приложение."""
+    messages = [{"type": "http.request", "body": body}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+def http_scope(method, path):
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+        ],
+        "client": ("127.0.0.1", 1024),
+        "server": ("testserver", 80),
+    }
+
+
+def test_wsgi_fallback_sends_request_finished():
+    finished = []
+
+    def receiver(sender, **kwargs):
+        finished.append(sender)
+
+    signals.request_finished.connect(receiver)
+    try:
+        sent = call(
+            Application(), http_scope("POST", "/api/v1/titles/"), b"{}"
+        )
+    finally:
+        signals.request_finished.disconnect(receiver)
+    assert sent[0]["type"] == "http.response.start"
+    assert sent[0]["status"] == 401
+    assert finished
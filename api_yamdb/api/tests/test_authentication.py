@@ -0,0 +1,41 @@
+"""Кеш пользователя токена (api.authentication)."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import User
+
+from .conftest import client_for
+
+
+def test_user_is_cached_with_shared_cache(shared_cache, admin):
+    user = User.objects.create(
+        username="manager", email="m@yamdb.test", role=User.ADMIN
+    )
+    client = client_for(user)
+    assert client.get("/api/v1/users/").status_code == 200
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/v1/titles/")
+    assert not any("reviews_user" in query["sql"] for query in queries)
+
+    response = client_for(admin).patch(
+        "/api/v1/users/manager/", {"role": User.USER}
+    )
+    assert response.status_code == 200
+    assert client.get("/api/v1/users/").status_code == 403
+
+
+def test_user_is_not_cached_with_local_cache(admin):
+    client = client_for(admin)
+    client.get("/api/v1/titles/")
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/v1/titles/")
+    assert any("reviews_user" in query["sql"] for query in queries)
+
+
+def test_cache_entry_is_capped(shared_cache, admin, settings):
+    settings.AUTH_USER_CACHE_TTL = 0
+    client = client_for(admin)
+    client.get("/api/v1/titles/")
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/v1/titles/")
+    assert any("reviews_user" in query["sql"] for query in queries)
@@ -0,0 +1,142 @@
+"""Пакетное создание произведений и отзывов."""
+
+import pytest
+from reviews.models import Review, Title, TitleStats, User
+
+from .conftest import client_for
+
+TITLES_BULK = "/api/v1/titles/bulk/"
+REVIEWS_BULK = "/api/v1/reviews/bulk/"
+# Не зависит от размера пачки; на SQLite учтены BEGIN и SAVEPOINT.
+TITLE_BULK_MAX_QUERIES = 10
+REVIEW_BULK_MAX_QUERIES = 15
+
+
+def title_items(count):
+    return [
+        {
+            "name": f"Новое {number}",
+            "year": 2001,
+            "category": "books",
+            "genre": ["drama", "novel"],
+        }
+        for number in range(count)
+    ]
+
+
+@pytest.fixture
+def readers(db):
+    return [
+        User.objects.create(
+            username=f"reader{number}", email=f"reader{number}@yamdb.test"
+        )
+        for number in range(50)
+    ]
+
+
+def test_title_errors_are_reported_by_index(catalog, admin):
+    items = title_items(3)
+    items[1]["category"] = "missing"
+    items[2]["year"] = 3000
+    response = client_for(admin).post(TITLES_BULK, items, format="json")
+    assert response.status_code == 400
+    assert response.data[0] == {}
+    assert set(response.data[1]) == {"category"}
+    assert set(response.data[2]) == {"year"}
+    assert Title.objects.count() == len(catalog["titles"])
+
+
+def test_titles_are_created_with_genres_and_stats(catalog, admin):
+    response = client_for(admin).post(
+        TITLES_BULK, title_items(3), format="json"
+    )
+    assert response.status_code == 201
+    titles = Title.objects.filter(
+        pk__in=[item["id"] for item in response.data]
+    )
+    assert titles.count() == 3
+    for title in titles:
+        assert {genre.slug for genre in title.genre.all()} == {
+            "drama", "novel"
+        }
+    assert TitleStats.objects.filter(title__in=titles).count() == 3
+
+
+def test_review_duplicates_in_batch_and_database(catalog, admin, readers):
+    titles = catalog["titles"]
+    items = [
+        # author0 уже написал отзыв на первое произведение.
+        {"title": titles[0].pk, "author": "author0", "text": "x", "score": 5},
+        {"title": titles[1].pk, "author": "reader0", "text": "x", "score": 5},
+        {"title": titles[1].pk, "author": "reader0", "text": "x", "score": 6},
+    ]
+    response = client_for(admin).post(REVIEWS_BULK, items, format="json")
+    assert response.status_code == 400
+    assert "non_field_errors" in response.data[0]
+    assert response.data[1] == {}
+    assert "non_field_errors" in response.data[2]
+    assert not Review.objects.filter(title=titles[1]).exists()
+
+
+def test_review_bulk_updates_ratings_stats_and_versions(
+    catalog, admin, readers
+):
+    title = catalog["titles"][1]
+    client = client_for()
+    titles_etag = client.get("/api/v1/titles/")["ETag"]
+    reviews_url = f"/api/v1/titles/{title.pk}/reviews/"
+    reviews_etag = client.get(reviews_url)["ETag"]
+    scores = [10, 7, 4]
+    response = client_for(admin).post(
+        REVIEWS_BULK,
+        [
+            {"title": title.pk, "author": reader.username, "text": "x",
+             "score": score}
+            for reader, score in zip(readers, scores)
+        ],
+        format="json",
+    )
+    assert response.status_code == 201
+    title.refresh_from_db()
+    assert title.rating_sum == sum(scores)
+    assert title.rating_count == len(scores)
+    assert title.rating == pytest.approx(sum(scores) / len(scores))
+    stats = TitleStats.objects.get(pk=title.pk)
+    assert stats.histogram == {
+        score: scores.count(score) for score in TitleStats.SCORES
+    }
+    assert stats.last_review_date is not None
+    assert client.get(
+        "/api/v1/titles/", HTTP_IF_NONE_MATCH=titles_etag
+    ).status_code == 200
+    response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+    assert response.status_code == 200
+    assert len(response.data["results"]) == len(scores)
+
+
+@pytest.mark.parametrize("size", [1, 10, 50])
+def test_review_bulk_queries_do_not_grow(
+    catalog, admin, readers, size, django_assert_max_num_queries
+):
+    titles = catalog["titles"]
+    items = [
+        {"title": titles[number % 5 + 1].pk, "author": reader.username,
+         "text": "x", "score": 5}
+        for number, reader in enumerate(readers[:size])
+    ]
+    client = client_for(admin)
+    with django_assert_max_num_queries(REVIEW_BULK_MAX_QUERIES):
+        response = client.post(REVIEWS_BULK, items, format="json")
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize("size", [1, 10, 50])
+def test_title_bulk_queries_do_not_grow(
+    catalog, admin, size, django_assert_max_num_queries
+):
+    client = client_for(admin)
+    with django_assert_max_num_queries(TITLE_BULK_MAX_QUERIES):
+        response = client.post(
+            TITLES_BULK, title_items(size), format="json"
+        )
+    assert response.status_code == 201
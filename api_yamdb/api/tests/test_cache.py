@@ -0,0 +1,33 @@
+"""Кеш списков категорий и жанров."""
+
+from reviews.models import Category
+
+from .conftest import client_for
+
+
+def test_listing_cache_is_per_host(db):
+    for number in range(3):
+        Category.objects.create(name=f"Категория {number}", slug=f"c{number}")
+    client = client_for()
+    first = client.get("/api/v1/categories/?limit=1", HTTP_HOST="a.test")
+    second = client.get("/api/v1/categories/?limit=1", HTTP_HOST="b.test")
+    assert first.data["next"].startswith("http://a.test/")
+    assert second.data["next"].startswith("http://b.test/")
+
+
+def test_listing_cache_counters_in_metrics(db, settings):
+    settings.METRICS_TOKEN = "secret"
+    client = client_for()
+    client.get("/api/v1/genres/")
+    client.get("/api/v1/genres/")
+    metrics = client.get(
+        "/metrics", HTTP_AUTHORIZATION="Bearer secret"
+    ).content.decode()
+    assert (
+        'yamdb_listing_cache_total{model="reviews.genre",event="hits"} 1'
+        in metrics
+    )
+    assert (
+        'yamdb_listing_cache_total{model="reviews.genre",event="misses"} 1'
+        in metrics
+    )
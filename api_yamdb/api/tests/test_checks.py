@@ -0,0 +1,18 @@
+from api.checks import check_shared_cache
+
+
+def test_process_local_cache_is_refused(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    assert [error.id for error in check_shared_cache(None)] == ["api.E001"]
+
+
+def test_shared_cache_passes(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.MemcachedCache",
+            "LOCATION": "memcached:11211",
+        }
+    }
+    assert check_shared_cache(None) == []
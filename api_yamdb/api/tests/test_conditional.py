@@ -0,0 +1,16 @@
+"""ETag и Last-Modified списков по версиям данных."""
+
+from .conftest import client_for
+
+
+def test_etag_changes_after_write(catalog, admin):
+    client = client_for()
+    url = "/api/v1/titles/"
+    etag = client.get(url)["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    response = client_for(admin).patch(
+        f"/api/v1/titles/{catalog['titles'][1].pk}/",
+        {"name": "Новое название"},
+    )
+    assert response.status_code == 200
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
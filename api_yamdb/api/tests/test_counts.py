@@ -0,0 +1,89 @@
+"""count списков без полного COUNT(*) (api.pagination, reviews.counts)."""
+
+import pytest
+from api import pagination
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews import counts
+from reviews.models import Title
+
+from .conftest import CATALOG_SIZE, client_for
+
+TITLES = "/api/v1/titles/"
+ESTIMATE = 1000
+
+
+def full_counts(queries):
+    """COUNT(*) без LIMIT во вложенном запросе."""
+    return [
+        query["sql"] for query in queries
+        if "COUNT(*)" in query["sql"] and "LIMIT" not in query["sql"]
+    ]
+
+
+@pytest.fixture
+def estimate(monkeypatch):
+    """Оценка по статистике, как у PostgreSQL; запоминает вызовы."""
+    calls = []
+
+    def estimated_count(model, using):
+        calls.append(model)
+        return ESTIMATE
+
+    monkeypatch.setattr(pagination, "estimated_count", estimated_count)
+    monkeypatch.setattr(counts, "estimated_count", estimated_count)
+    return calls
+
+
+def test_small_count_is_exact(catalog, settings):
+    settings.COUNT_EXACT_LIMIT = CATALOG_SIZE
+    response = client_for().get(TITLES)
+    assert response.data["count"] == CATALOG_SIZE
+    assert response.data["count_approximate"] is False
+
+
+def test_large_count_is_cached(catalog, settings):
+    settings.COUNT_EXACT_LIMIT = 10
+    client = client_for()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"{TITLES}?limit=5")
+    assert response.data["count"] == CATALOG_SIZE
+    assert response.data["count_approximate"] is True
+    assert len(full_counts(queries)) == 1
+    Title.objects.create(name="Новое", year=2000)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"{TITLES}?limit=5")
+    assert response.data["count"] == CATALOG_SIZE
+    assert response.data["count_approximate"] is True
+    assert full_counts(queries) == []
+
+
+def test_large_count_uses_table_estimate(catalog, settings, estimate):
+    settings.COUNT_EXACT_LIMIT = 10
+    with CaptureQueriesContext(connection) as queries:
+        response = client_for().get(TITLES)
+    assert response.data["count"] == ESTIMATE
+    assert response.data["count_approximate"] is True
+    assert estimate == [Title]
+    assert full_counts(queries) == []
+
+
+def test_filtered_count_ignores_table_estimate(catalog, settings, estimate):
+    settings.COUNT_EXACT_LIMIT = 10
+    response = client_for().get(f"{TITLES}?year=2000")
+    assert response.data["count"] == CATALOG_SIZE
+    assert response.data["count_approximate"] is True
+    assert estimate == []
+
+
+def test_bounded_count(catalog, estimate):
+    titles = Title.objects.all()
+    assert counts.bounded_count(titles, ESTIMATE) == CATALOG_SIZE
+    assert counts.bounded_count(titles, 10) == ESTIMATE
+    assert counts.bounded_count(titles.filter(year=2000), 10) == 10
+
+
+def test_estimated_count_needs_postgresql(db):
+    if connection.vendor == "postgresql":
+        pytest.skip("оценка берется из pg_class")
+    assert counts.estimated_count(Title, "default") is None
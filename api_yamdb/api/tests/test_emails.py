@@ -0,0 +1,85 @@
+"""Очередь писем OutboxEmail и команда send_emails."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import OutboxEmail, User
+
+from .conftest import client_for
+
+LOCMEM_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+RETRY_DELAY = 30
+
+
+class FailingBackend(BaseEmailBackend):
+    """Почтовый сервер, который не принимает письма."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP недоступен")
+
+
+@pytest.fixture
+def signed_up(db, settings):
+    settings.EMAIL_BACKEND = LOCMEM_BACKEND
+    response = client_for().post(
+        "/api/v1/auth/signup/",
+        {"username": "reader", "email": "reader@yamdb.test"},
+    )
+    assert response.status_code == 200
+    return User.objects.get(username="reader")
+
+
+def send_emails(**options):
+    call_command(
+        "send_emails", once=True, retry_delay=RETRY_DELAY, stdout=StringIO(),
+        **options,
+    )
+
+
+def test_signup_queues_email_without_sending(signed_up):
+    email = OutboxEmail.objects.get()
+    assert email.recipient == "reader@yamdb.test"
+    assert email.status == OutboxEmail.PENDING
+    assert signed_up.confirmation_code in email.body
+    assert mail.outbox == []
+
+
+def test_send_emails_delivers_queue(signed_up):
+    send_emails()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["reader@yamdb.test"]
+    assert signed_up.confirmation_code in mail.outbox[0].body
+    email = OutboxEmail.objects.get()
+    assert email.status == OutboxEmail.SENT
+    assert email.attempts == 1
+    assert email.sent_at is not None
+    send_emails()
+    assert len(mail.outbox) == 1
+
+
+def test_failed_delivery_backs_off_then_fails(signed_up, settings):
+    settings.EMAIL_BACKEND = f"{__name__}.FailingBackend"
+    for attempt in (1, 2):
+        started = timezone.now()
+        send_emails(max_attempts=3)
+        email = OutboxEmail.objects.get()
+        assert email.status == OutboxEmail.PENDING
+        assert email.attempts == attempt
+        assert "SMTP недоступен" in email.last_error
+        delay = timedelta(seconds=RETRY_DELAY * 2 ** (attempt - 1))
+        assert started + delay <= email.next_attempt_at
+        assert email.next_attempt_at <= timezone.now() + delay
+        # Следующая попытка еще не наступила.
+        send_emails(max_attempts=3)
+        assert OutboxEmail.objects.get().attempts == attempt
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+    send_emails(max_attempts=3)
+    email = OutboxEmail.objects.get()
+    assert email.status == OutboxEmail.FAILED
+    assert email.attempts == 3
+    assert mail.outbox == []
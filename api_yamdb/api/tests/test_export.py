@@ -0,0 +1,120 @@
+"""Потоковая выгрузка каталога (reviews.export, /titles/export/)."""
+
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test.utils import CaptureQueriesContext
+from reviews.export import TITLE_COLUMNS, export_lines
+from reviews.models import Title
+
+from .conftest import CATALOG_SIZE, client_for
+
+EXPORT = "/api/v1/titles/export/"
+
+
+def content(response):
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+def test_ndjson(catalog, admin):
+    response = client_for(admin).get(EXPORT)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in content(response).splitlines()]
+    assert [record["id"] for record in records] == [
+        title.pk for title in catalog["titles"]
+    ]
+    first = records[0]
+    assert first["category"] == {"name": "Книги", "slug": "books"}
+    assert {genre["slug"] for genre in first["genre"]} == {"drama", "novel"}
+    assert first["rating_count"] == len(catalog["reviews"])
+    assert "reviews" not in first
+
+
+def test_ndjson_with_reviews(catalog, admin):
+    response = client_for(admin).get(EXPORT, {"reviews": 1})
+    records = [json.loads(line) for line in content(response).splitlines()]
+    assert len(records[0]["reviews"]) == len(catalog["reviews"])
+    assert records[0]["reviews"][0]["author"] == "author0"
+    assert all(record["reviews"] == [] for record in records[1:])
+
+
+def test_csv(catalog, admin):
+    response = client_for(admin).get(EXPORT, {"output": "csv"})
+    assert response["Content-Type"].startswith("text/csv")
+    assert 'filename="titles.csv"' in response["Content-Disposition"]
+    rows = list(csv.DictReader(StringIO(content(response))))
+    assert tuple(rows[0]) == TITLE_COLUMNS
+    assert len(rows) == CATALOG_SIZE
+    assert rows[0]["genre"] == "drama,novel"
+
+
+def test_csv_with_reviews(catalog, admin):
+    response = client_for(admin).get(
+        EXPORT, {"output": "csv", "reviews": "1"}
+    )
+    rows = list(csv.DictReader(StringIO(content(response))))
+    # Строка на отзыв первого произведения и по строке на остальные.
+    assert len(rows) == len(catalog["reviews"]) + CATALOG_SIZE - 1
+    assert rows[0]["review_author"] == "author0"
+    assert rows[-1]["review_id"] == ""
+
+
+def test_bad_output_is_rejected(catalog, admin):
+    response = client_for(admin).get(EXPORT, {"output": "xml"})
+    assert response.status_code == 400
+    assert "output" in response.data
+
+
+@pytest.mark.parametrize("role", [None, "user", "moderator"])
+def test_export_is_admin_only(catalog, role):
+    user = None
+    if role is not None:
+        user = catalog["authors"][0]
+        user.role = role
+        user.save()
+    response = client_for(user).get(EXPORT)
+    assert response.status_code in (401, 403)
+    if user is not None:
+        assert response.status_code == 403
+
+
+def test_export_streams_in_chunks(catalog, monkeypatch):
+    chunk_sizes = []
+    iterator = QuerySet.iterator
+
+    def recording(self, chunk_size=2000):
+        chunk_sizes.append(chunk_size)
+        return iterator(self, chunk_size=chunk_size)
+
+    monkeypatch.setattr(QuerySet, "iterator", recording)
+    with CaptureQueriesContext(connection) as queries:
+        lines = export_lines("ndjson", include_reviews=True, chunk_size=5)
+        assert len(queries) == 0
+        first = json.loads(next(lines))
+        assert first["id"] == catalog["titles"][0].pk
+        rest = list(lines)
+    assert chunk_sizes == [5, 5, 5]
+    assert len(rest) == CATALOG_SIZE - 1
+    # Три запроса на всю выгрузку, а не по запросу на произведение.
+    assert len(queries) == 3
+    Title.objects.create(name="Еще одно", year=2000)
+    with CaptureQueriesContext(connection) as queries:
+        list(export_lines("ndjson", include_reviews=True, chunk_size=5))
+    assert len(queries) == 3
+
+
+def test_export_titles_command(catalog, tmp_path):
+    path = tmp_path / "titles.csv"
+    call_command("export_titles", output_format="csv", file=str(path))
+    with open(path, encoding="utf-8") as file:
+        assert len(list(csv.DictReader(file))) == CATALOG_SIZE
+    out = StringIO()
+    call_command("export_titles", stdout=out)
+    assert len(out.getvalue().splitlines()) == CATALOG_SIZE
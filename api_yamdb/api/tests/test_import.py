@@ -0,0 +1,79 @@
+"""Пакетный импорт csv (import_csv --bulk) и отчет recalculate_ratings."""
+
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+CSV_FILES = {
+    "users.csv": [
+        {"id": 1, "username": "first", "email": "first@yamdb.test",
+         "role": "user", "bio": "", "first_name": "", "last_name": ""},
+        {"id": 2, "username": "second", "email": "second@yamdb.test",
+         "role": "moderator", "bio": "", "first_name": "", "last_name": ""},
+    ],
+    "category.csv": [{"id": 1, "name": "Книги", "slug": "books"}],
+    "genre.csv": [{"id": 1, "name": "Драма", "slug": "drama"}],
+    "titles.csv": [
+        {"id": 1, "name": "Первое", "year": 2000, "category": 1},
+        {"id": 2, "name": "Второе", "year": 2001, "category": 1},
+    ],
+    "review.csv": [
+        {"id": 1, "title_id": 1, "text": "Отзыв", "author": 1, "score": 10,
+         "pub_date": "2020-01-01T00:00:00Z"},
+        {"id": 2, "title_id": 1, "text": "Отзыв", "author": 2, "score": 5,
+         "pub_date": "2020-01-02T00:00:00Z"},
+    ],
+    "comments.csv": [
+        {"id": 1, "review_id": 1, "text": "Комментарий", "author": 2,
+         "pub_date": "2020-01-03T00:00:00Z"},
+    ],
+}
+
+
+@pytest.fixture
+def csv_data(tmp_path, monkeypatch):
+    """static/data/ с csv-файлами во временной рабочей папке."""
+    data = tmp_path / "static" / "data"
+    data.mkdir(parents=True)
+    for name, rows in CSV_FILES.items():
+        with open(data / name, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    monkeypatch.chdir(tmp_path)
+
+
+def test_bulk_import_loads_tables_and_ratings(db, csv_data):
+    out = StringIO()
+    call_command("import_csv", bulk=True, batch_size=1, stdout=out)
+    for model, name in (
+        (User, "users.csv"),
+        (Category, "category.csv"),
+        (Genre, "genre.csv"),
+        (Title, "titles.csv"),
+        (Review, "review.csv"),
+        (Comment, "comments.csv"),
+    ):
+        assert model.objects.count() == len(CSV_FILES[name])
+        assert f"Данные из {name} перенесены" in out.getvalue()
+    title = Title.objects.get(pk=1)
+    assert (title.rating_sum, title.rating_count) == (15, 2)
+    assert title.rating == pytest.approx(7.5)
+    assert title.stats.histogram[10] == 1
+    assert Title.objects.get(pk=2).rating is None
+    # Счетчик id сдвинут за загруженные строки.
+    assert Category.objects.create(name="Кино", slug="movies").pk == 2
+
+
+def test_recalculate_ratings_reports_drift_by_default(db):
+    title = Title.objects.create(name="Произведение", year=2000)
+    Title.objects.filter(pk=title.pk).update(rating_sum=7, rating_count=1)
+    out = StringIO()
+    call_command("recalculate_ratings", stdout=out)
+    assert f"Произведение {title.pk}: сумма 7 -> 0" in out.getvalue()
+    out = StringIO()
+    call_command("recalculate_ratings", verbosity=0, stdout=out)
+    assert out.getvalue() == ""
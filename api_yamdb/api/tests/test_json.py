@@ -0,0 +1,62 @@
+"""FastJSONRenderer и FastJSONParser совпадают с JSON-классами DRF."""
+
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+DATA = [
+    {
+        "decimal": Decimal("7.50"),
+        "decimals": [Decimal("0"), Decimal("-1.000001"), Decimal("1E+3")],
+        "datetime": timezone.now(),
+        "naive": datetime.datetime(2020, 1, 2, 3, 4, 5, 123456),
+        "date": datetime.date(2020, 1, 2),
+        "time": datetime.time(3, 4, 5, 678),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "timedelta": datetime.timedelta(days=1, seconds=5),
+    },
+    {"text": "Строка \u2028 \u2029 \"кавычки\" \\ \n", "emoji": "\U0001f600"},
+    {"floats": [0.1, 7.5, 1e20, 1e-7, 0.00001, -0.0], "big": 2 ** 70},
+    {"none": None, "bool": [True, False], "nested": {"list": [[], {}]}},
+]
+
+
+def test_orjson_is_installed():
+    assert renderers.orjson is not None
+    assert parsers.orjson is not None
+
+
+@pytest.mark.parametrize("data", DATA)
+def test_renderer_matches_drf(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_renderer_matches_drf_with_indent():
+    context = {"indent": 2}
+    assert FastJSONRenderer().render(
+        DATA[1], renderer_context=context
+    ) == JSONRenderer().render(DATA[1], renderer_context=context)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        '{"name": "Книга", "year": 2000, "genre": ["drama"]}',
+        '{"big": 123456789012345678901234567890}',
+        '[1.5, null, true, "\\u2028"]',
+    ],
+)
+def test_parser_matches_drf(body):
+    encoded = body.encode()
+    assert FastJSONParser().parse(io.BytesIO(encoded)) == (
+        JSONParser().parse(io.BytesIO(encoded))
+    )
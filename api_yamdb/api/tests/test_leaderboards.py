@@ -0,0 +1,105 @@
+"""Топы произведений категорий и жанров (reviews.leaderboards)."""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Category, Genre, Review, Title, User
+
+from .conftest import client_for
+
+CATEGORY_TOP = "/api/v1/leaderboards/categories/{slug}/"
+GENRE_TOP = "/api/v1/leaderboards/genres/{slug}/"
+VOTES = 10
+
+
+@pytest.fixture
+def ranked(db):
+    """
+    Одна десятка, десять девяток и десять двоек: средняя оценка 120/21,
+    поэтому при LEADERBOARD_MIN_VOTES=10 десять девяток выше одной
+    десятки, а без порога - ниже.
+    """
+    category = Category.objects.create(name="Книги", slug="books")
+    genre = Genre.objects.create(name="Драма", slug="drama")
+    authors = [
+        User.objects.create(
+            username=f"voter{number}", email=f"voter{number}@yamdb.test"
+        )
+        for number in range(VOTES)
+    ]
+    titles = {}
+    for name, scores in (
+        ("single", [10]),
+        ("many", [9] * VOTES),
+        ("low", [2] * VOTES),
+    ):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set([genre])
+        for author, score in zip(authors, scores):
+            Review.objects.create(
+                title=title, author=author, text="Отзыв", score=score
+            )
+        titles[name] = title
+    return titles
+
+
+def refresh():
+    call_command("refresh_leaderboards", full=True, stdout=StringIO())
+
+
+def names(response):
+    return [entry["title"]["name"] for entry in response.data["results"]]
+
+
+def test_min_votes_outweigh_single_top_score(ranked, settings):
+    settings.LEADERBOARD_MIN_VOTES = 10
+    refresh()
+    response = client_for().get(CATEGORY_TOP.format(slug="books"))
+    assert response.status_code == 200
+    assert names(response) == ["many", "single", "low"]
+    assert [entry["position"] for entry in response.data["results"]] == [
+        1, 2, 3
+    ]
+    mean = 120 / 21
+    assert response.data["results"][0]["weighted_rating"] == pytest.approx(
+        (90 + 10 * mean) / 20
+    )
+    assert response.data["min_votes"] == 10
+    assert response.data["refreshed_at"] is not None
+    response = client_for().get(GENRE_TOP.format(slug="drama"))
+    assert names(response) == ["many", "single", "low"]
+
+
+def test_without_min_votes_average_wins(ranked, settings):
+    settings.LEADERBOARD_MIN_VOTES = 0
+    refresh()
+    response = client_for().get(CATEGORY_TOP.format(slug="books"))
+    assert names(response) == ["single", "many", "low"]
+
+
+def test_limit(ranked, settings):
+    settings.LEADERBOARD_SIZE = 2
+    refresh()
+    url = CATEGORY_TOP.format(slug="books")
+    client = client_for()
+    assert len(client.get(url).data["results"]) == 2
+    assert len(client.get(url, {"limit": 1}).data["results"]) == 1
+    for limit in ("0", "3", "-1", "abc", ""):
+        response = client.get(url, {"limit": limit})
+        assert response.status_code == 400
+        assert "limit" in response.data
+
+
+def test_unknown_slug_is_not_found(ranked):
+    refresh()
+    client = client_for()
+    assert client.get(CATEGORY_TOP.format(slug="missing")).status_code == 404
+    assert client.get(GENRE_TOP.format(slug="books")).status_code == 404
+
+
+def test_empty_group_before_refresh(ranked):
+    response = client_for().get(CATEGORY_TOP.format(slug="books"))
+    assert response.status_code == 200
+    assert response.data["results"] == []
+    assert response.data["refreshed_at"] is None
@@ -0,0 +1,50 @@
+"""Эндпоинт /metrics и список воркеров (api.metrics)."""
+
+import os
+import time
+
+import pytest
+from api.metrics import WORKER_KEY, WORKERS_KEY, registry
+from django.core.cache import cache
+
+from .conftest import client_for
+
+TOKEN = "secret"
+DEAD_PID = -1
+
+
+@pytest.mark.parametrize(
+    "token, header, status",
+    [
+        ("", None, 404),
+        ("", "Bearer ", 404),
+        (TOKEN, None, 403),
+        (TOKEN, "Bearer wrong", 403),
+        (TOKEN, f"Bearer {TOKEN}", 200),
+    ],
+)
+def test_metrics_require_token(db, settings, token, header, status):
+    settings.METRICS_TOKEN = token
+    extra = {"HTTP_AUTHORIZATION": header} if header is not None else {}
+    assert client_for().get("/metrics", **extra).status_code == status
+
+
+def test_silent_workers_expire(db, settings):
+    settings.METRICS_TOKEN = TOKEN
+    settings.METRICS_WORKER_TTL = 60
+    snapshot = {"requests": {("DeadViewSet.list", 200): 7}}
+    cache.set(WORKER_KEY.format(pid=DEAD_PID), snapshot)
+    cache.set(WORKERS_KEY, {DEAD_PID: time.time() - 61})
+    registry.flush(force=True)
+    assert set(cache.get(WORKERS_KEY)) == {os.getpid()}
+    metrics = client_for().get(
+        "/metrics", HTTP_AUTHORIZATION=f"Bearer {TOKEN}"
+    ).content.decode()
+    assert "DeadViewSet.list" not in metrics
+
+
+def test_live_workers_are_kept(db, settings):
+    settings.METRICS_WORKER_TTL = 60
+    cache.set(WORKERS_KEY, {DEAD_PID: time.time() - 30})
+    registry.flush(force=True)
+    assert set(cache.get(WORKERS_KEY)) == {DEAD_PID, os.getpid()}
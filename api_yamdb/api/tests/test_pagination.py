@@ -0,0 +1,62 @@
+"""Курсорный режим: те же строки, что и OFFSET, в обе стороны."""
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review, Title
+
+from .conftest import client_for
+
+
+def walk(client, url, key="next"):
+    rows = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        rows.append([row["id"] for row in response.data["results"]])
+        url = response.data[key]
+    return rows
+
+
+@pytest.mark.parametrize("path", ["/api/v1/titles/", "reviews"])
+def test_cursor_matches_offset(catalog, path):
+    title = catalog["titles"][0]
+    if path == "reviews":
+        path = f"/api/v1/titles/{title.pk}/reviews/"
+    # Несколько произведений с оценками, остальные - с rating NULL.
+    for other, score in zip(catalog["titles"][1:4], (3, 9, 3)):
+        Review.objects.create(
+            title=other, author=catalog["authors"][0], text="x", score=score
+        )
+    client = client_for()
+    if path.endswith("/reviews/"):
+        expected = list(
+            title.reviews.order_by("-pub_date", "-pk")
+            .values_list("pk", flat=True)
+        )
+    else:
+        # NULL больше любого значения, как в PostgreSQL.
+        expected = list(
+            Title.objects.order_by(
+                F("rating").desc(nulls_first=True), "name", "pk"
+            ).values_list("pk", flat=True)
+        )
+    forward = walk(client, f"{path}?cursor=&limit=4")
+    assert sum(forward, []) == expected
+
+    last = client.get(f"{path}?cursor=&limit=4")
+    while last.data["next"]:
+        last = client.get(last.data["next"])
+    backward = walk(client, last.data["previous"], key="previous")
+    assert sum(reversed(backward), []) + forward[-1] == expected
+
+
+def test_cursor_bounds_leading_column(catalog):
+    title = catalog["titles"][0]
+    client = client_for()
+    first = client.get(f"/api/v1/titles/{title.pk}/reviews/?cursor=&limit=5")
+    with CaptureQueriesContext(connection) as queries:
+        client.get(first.data["next"])
+    page_sql = queries[-1]["sql"]
+    assert '"pub_date" <=' in page_sql
@@ -0,0 +1,111 @@
+"""Число SQL-запросов: страница не зависит от размера, запись - фиксирована."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import User
+
+from .conftest import client_for
+
+PAGE_SIZES = (5, 10, 20)
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_titles_list_queries(catalog, django_assert_num_queries, limit):
+    # count, страница с категорией, жанры страницы
+    with django_assert_num_queries(3):
+        response = client_for().get(f"/api/v1/titles/?limit={limit}")
+    assert response.status_code == 200
+    assert len(response.data["results"]) == limit
+    assert all(
+        len(title["genre"]) == 2 for title in response.data["results"]
+    )
+
+
+def test_title_retrieve_queries(catalog, django_assert_num_queries):
+    title = catalog["titles"][0]
+    # произведение с категорией, его жанры
+    with django_assert_num_queries(2):
+        response = client_for().get(f"/api/v1/titles/{title.pk}/")
+    assert response.status_code == 200
+    assert response.data["category"]["slug"] == "books"
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_reviews_list_queries(catalog, django_assert_num_queries, limit):
+    title = catalog["titles"][0]
+    # произведение, count, страница с авторами
+    with django_assert_num_queries(3):
+        response = client_for().get(
+            f"/api/v1/titles/{title.pk}/reviews/?limit={limit}"
+        )
+    assert response.status_code == 200
+    assert len(response.data["results"]) == limit
+    assert response.data["results"][0]["author"].startswith("author")
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_comments_list_queries(catalog, django_assert_num_queries, limit):
+    review = catalog["reviews"][0]
+    url = f"/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/"
+    # отзыв, count, страница с авторами
+    with django_assert_num_queries(3):
+        response = client_for().get(f"{url}?limit={limit}")
+    assert response.status_code == 200
+    assert len(response.data["results"]) == limit
+    assert response.data["results"][0]["author"].startswith("author")
+
+
+def statements(queries):
+    """SQL-запросы без точек сохранения транзакции теста."""
+    return [
+        " ".join(query["sql"].split()[:3])
+        for query in queries
+        if "SAVEPOINT" not in query["sql"]
+    ]
+
+
+@pytest.fixture
+def author_client(shared_cache, db):
+    author = User.objects.create(username="newbie", email="new@yamdb.test")
+    client = client_for(author)
+    # Пользователь токена попадает в кеш (api.authentication).
+    assert client.get("/api/v1/users/me/").status_code == 200
+    return client
+
+
+def test_review_create_queries(catalog, author_client):
+    title = catalog["titles"][1]
+    with CaptureQueriesContext(connection) as queries:
+        response = author_client.post(
+            f"/api/v1/titles/{title.pk}/reviews/", {"text": "x", "score": 7}
+        )
+    assert response.status_code == 201
+    # Произведение один раз и вставка отзыва (повтор отсекает
+    # ограничение author_title_connection), затем счетчики рейтинга
+    # и статистики (reviews.signals).
+    assert statements(queries) == [
+        'SELECT "reviews_title"."id" FROM',
+        'INSERT INTO "reviews_review"',
+        'UPDATE "reviews_title" SET',
+        'UPDATE "reviews_titlestats" SET',
+    ]
+    response = author_client.post(
+        f"/api/v1/titles/{title.pk}/reviews/", {"text": "x", "score": 7}
+    )
+    assert response.status_code == 400
+
+
+def test_comment_create_queries(catalog, author_client):
+    review = catalog["reviews"][0]
+    with CaptureQueriesContext(connection) as queries:
+        response = author_client.post(
+            f"/api/v1/titles/{review.title_id}/reviews/{review.pk}"
+            "/comments/",
+            {"text": "x"},
+        )
+    assert response.status_code == 201
+    assert statements(queries) == [
+        'SELECT "reviews_review"."id", "reviews_review"."title_id"',
+        'INSERT INTO "reviews_comment"',
+    ]
@@ -0,0 +1,109 @@
+"""Рейтинг произведения в полях Title (reviews.signals)."""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title, User
+
+
+def assert_rating(title, scores):
+    title.refresh_from_db()
+    assert title.rating_sum == sum(scores)
+    assert title.rating_count == len(scores)
+    if scores:
+        assert title.rating == pytest.approx(sum(scores) / len(scores))
+    else:
+        assert title.rating is None
+
+
+@pytest.fixture
+def titles(db):
+    return [
+        Title.objects.create(name=f"Произведение {number}", year=2000)
+        for number in range(2)
+    ]
+
+
+@pytest.fixture
+def authors(db):
+    return [
+        User.objects.create(
+            username=f"author{number}", email=f"author{number}@yamdb.test"
+        )
+        for number in range(3)
+    ]
+
+
+def review(title, author, score):
+    return Review.objects.create(
+        title=title, author=author, text="Отзыв", score=score
+    )
+
+
+def test_create_review(titles, authors):
+    review(titles[0], authors[0], 8)
+    review(titles[0], authors[1], 3)
+    assert_rating(titles[0], [8, 3])
+    assert_rating(titles[1], [])
+
+
+def test_change_score_of_loaded_review(titles, authors):
+    review(titles[0], authors[0], 8)
+    review(titles[0], authors[1], 3)
+    loaded = Review.objects.get(author=authors[0])
+    loaded.score = 1
+    loaded.save()
+    assert_rating(titles[0], [1, 3])
+
+
+def test_move_review_to_another_title(titles, authors):
+    review(titles[0], authors[0], 8)
+    review(titles[0], authors[1], 3)
+    loaded = Review.objects.get(author=authors[0])
+    loaded.title = titles[1]
+    loaded.score = 6
+    loaded.save()
+    assert_rating(titles[0], [3])
+    assert_rating(titles[1], [6])
+
+
+def test_delete_review(titles, authors):
+    review(titles[0], authors[0], 8)
+    review(titles[0], authors[1], 3)
+    Review.objects.get(author=authors[0]).delete()
+    assert_rating(titles[0], [3])
+    Review.objects.get(author=authors[1]).delete()
+    assert_rating(titles[0], [])
+
+
+def test_delete_author_cascades_to_reviews(titles, authors):
+    review(titles[0], authors[0], 8)
+    review(titles[1], authors[0], 2)
+    review(titles[0], authors[1], 4)
+    authors[0].delete()
+    assert_rating(titles[0], [4])
+    assert_rating(titles[1], [])
+
+
+def test_recalculate_ratings_fixes_drift(titles, authors):
+    review(titles[0], authors[0], 8)
+    review(titles[0], authors[1], 3)
+    Title.objects.filter(pk=titles[0].pk).update(
+        rating_sum=100, rating_count=1, rating=100
+    )
+    Title.objects.filter(pk=titles[1].pk).update(rating=5)
+    out = StringIO()
+    call_command("recalculate_ratings", stdout=out)
+    report = out.getvalue()
+    assert (
+        f"Произведение {titles[0].pk}: сумма 100 -> 11, количество 1 -> 2."
+        in report
+    )
+    assert f"Произведение {titles[1].pk}:" in report
+    assert "Найдено расхождений: 2, исправлено: 2." in report
+    assert_rating(titles[0], [8, 3])
+    assert_rating(titles[1], [])
+    out = StringIO()
+    call_command("recalculate_ratings", stdout=out)
+    assert "Найдено расхождений: 0, исправлено: 0." in out.getvalue()
@@ -0,0 +1,67 @@
+import pytest
+from api import replicas
+from api.replicas import ReplicaRouter, token_user_id
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .conftest import client_for
+
+
+@pytest.mark.parametrize(
+    "header", ["", "Bearer", "Bearer a b", "Bearer invalid", "Basic abc"]
+)
+def test_token_user_id_ignores_bad_headers(header):
+    request = RequestFactory().get("/", HTTP_AUTHORIZATION=header)
+    assert token_user_id(request) is None
+
+
+def test_token_user_id_reads_valid_token(admin):
+    request = RequestFactory().get(
+        "/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}"
+    )
+    assert token_user_id(request) == admin.pk
+
+
+@pytest.mark.parametrize("header", ["Bearer", "Bearer a b"])
+def test_bad_header_is_not_server_error(settings, catalog, header):
+    settings.DATABASE_REPLICAS = ["default"]
+    response = APIClient().get("/api/v1/titles/", HTTP_AUTHORIZATION=header)
+    assert response.status_code == 401
+
+
+@pytest.fixture
+def read_dbs(settings, monkeypatch):
+    """
+    Реплика - та же тестовая база, поэтому запоминается выбор роутера:
+    "default" из DATABASE_REPLICAS или None, если чтение идет с default.
+    """
+    settings.DATABASE_REPLICAS = ["default"]
+    chosen = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def recording(self, model, **hints):
+        chosen.append(getattr(replicas.state, "read_db", None))
+        return db_for_read(self, model, **hints)
+
+    monkeypatch.setattr(ReplicaRouter, "db_for_read", recording)
+    return chosen
+
+
+@pytest.mark.parametrize(
+    "url", ["/api/v1/titles/", "/api/v1/categories/"]
+)
+def test_recent_changes_are_read_from_primary(catalog, read_dbs, url):
+    assert client_for().get(url).status_code == 200
+    assert read_dbs[-1] is None
+
+
+@pytest.mark.parametrize(
+    "url", ["/api/v1/titles/", "/api/v1/categories/"]
+)
+def test_settled_changes_are_read_from_replica(
+    settings, catalog, read_dbs, url
+):
+    settings.REPLICA_PIN_SECONDS = 0
+    assert client_for().get(url).status_code == 200
+    assert read_dbs[-1] == "default"
@@ -0,0 +1,39 @@
+from api.replicas import ReplicaRouter
+from reviews.models import Review, TitleStats
+
+from .conftest import client_for
+
+
+def test_stats_of_unknown_title_is_not_found(catalog):
+    client = client_for()
+    assert client.get("/api/v1/titles/abc/stats/").status_code == 404
+    assert client.get("/api/v1/titles/0/stats/").status_code == 404
+
+
+def test_stats_are_built_for_title_without_row(catalog):
+    title = catalog["titles"][0]
+    TitleStats.objects.filter(pk=title.pk).delete()
+    response = client_for().get(f"/api/v1/titles/{title.pk}/stats/")
+    assert response.status_code == 200
+    assert response.data["count"] == len(catalog["reviews"])
+    assert TitleStats.objects.filter(pk=title.pk).exists()
+
+
+def test_missing_stats_are_not_read_back_from_replica(
+    settings, monkeypatch, catalog
+):
+    """Реплика без новых строк: чтение статистики и отзывов с нее упадет."""
+    settings.DATABASE_REPLICAS = ["default"]
+    db_for_read = ReplicaRouter.db_for_read
+
+    def lagging(self, model, **hints):
+        if model in (TitleStats, Review):
+            return "lagging"
+        return db_for_read(self, model, **hints)
+
+    monkeypatch.setattr(ReplicaRouter, "db_for_read", lagging)
+    title = catalog["titles"][0]
+    TitleStats.objects.filter(pk=title.pk).delete()
+    response = client_for().get(f"/api/v1/titles/{title.pk}/stats/")
+    assert response.status_code == 200
+    assert response.data["count"] == len(catalog["reviews"])
@@ -0,0 +1,64 @@
+import pytest
+from api.mixins import ValuesListMixin
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from rest_framework.test import APIRequestFactory
+
+from .conftest import client_for
+
+TITLE_QUERIES = (
+    "",
+    "?limit=100",
+    "?genre=drama&limit=3&offset=2",
+    "?cursor=&limit=4",
+    "?name=Произведение 1",
+    "?stats=1&limit=100",
+)
+PAGE_QUERIES = ("", "?limit=5&offset=3", "?cursor=&limit=4")
+
+
+def serializer_list(viewset, url, **kwargs):
+    """Ответ list того же вьюсета через обычный serializer_class."""
+    class SerializerViewSet(viewset):
+        def list(self, request, *args, **kwargs):
+            return super(ValuesListMixin, self).list(
+                request, *args, **kwargs
+            )
+
+    request = APIRequestFactory().get(url)
+    view = SerializerViewSet.as_view({"get": "list"})
+    return view(request, **kwargs).render().content
+
+
+@pytest.mark.parametrize("query", TITLE_QUERIES)
+def test_titles_values_match_serializer(catalog, query):
+    title = catalog["titles"][3]
+    title.description = "Описание"
+    title.category = None
+    title.save()
+    url = f"/api/v1/titles/{query}"
+    content = client_for().get(url).content
+    assert b'"results":[{' in content.replace(b" ", b"")
+    assert ("stats" in query) == (b'"stats"' in content)
+    assert content == serializer_list(TitleViewSet, url)
+
+
+@pytest.mark.parametrize("query", PAGE_QUERIES)
+def test_reviews_values_match_serializer(catalog, query):
+    title = catalog["titles"][0]
+    url = f"/api/v1/titles/{title.pk}/reviews/{query}"
+    assert (
+        client_for().get(url).content
+        == serializer_list(ReviewViewSet, url, title_id=title.pk)
+    )
+
+
+@pytest.mark.parametrize("query", PAGE_QUERIES)
+def test_comments_values_match_serializer(catalog, query):
+    review = catalog["reviews"][0]
+    url = (
+        f"/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/"
+        f"{query}"
+    )
+    assert client_for().get(url).content == serializer_list(
+        CommentViewSet, url, title_id=review.title_id, review_id=review.pk
+    )
@@ -1,9 +1,11 @@
 from django.urls import include, path
 from rest_framework import routers
 
+from reviews.models import LeaderboardEntry
+
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UsersViewSet, user_auth,
-                    user_signup)
+                    ReviewViewSet, TitleViewSet, UsersViewSet, leaderboard,
+                    reviews_bulk, user_auth, user_signup)
 
 app_name = 'api'
 
@@ -25,5 +27,16 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/signup/', user_signup),
     path('v1/auth/token/', user_auth),
+    path('v1/reviews/bulk/', reviews_bulk),
+    path(
+        'v1/leaderboards/categories/<slug:slug>/',
+        leaderboard,
+        {'kind': LeaderboardEntry.CATEGORY},
+    ),
+    path(
+        'v1/leaderboards/genres/<slug:slug>/',
+        leaderboard,
+        {'kind': LeaderboardEntry.GENRE},
+    ),
     path('v1/', include(router_v1.urls)),
 ]
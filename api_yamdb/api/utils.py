@@ -1,7 +1,7 @@
 import random
 
-from django.core.mail import send_mail
 from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import OutboxEmail
 
 from api_yamdb.settings import (CONFIRMATION_CODE_CHARACTERS,
                                 CONFIRMATION_CODE_LENGTH, EMAIL_HOST_USER)
@@ -18,14 +18,19 @@ def create_confirmation_code():
 
 
 def send_email(email, confirmation_code, name):
-    """Отправка пользователю письма с кодом подтверждения."""
-
-    send_mail(
-        "Регистрация на сайте.",
-        f"Здравствуйте, {name}, ваш код подтверждения: {confirmation_code}.",
-        EMAIL_HOST_USER,
-        [email],
-        fail_silently=False,
+    """
+    Постановка в очередь письма с кодом подтверждения.
+    Отправляет письмо команда send_emails, а не текущий запрос.
+    """
+
+    OutboxEmail.objects.create(
+        subject="Регистрация на сайте.",
+        body=(
+            f"Здравствуйте, {name}, ваш код подтверждения: "
+            f"{confirmation_code}."
+        ),
+        from_email=EMAIL_HOST_USER,
+        recipient=email,
     )
 
 
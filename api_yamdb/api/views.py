@@ -1,27 +1,60 @@
-from django.db.models import Avg
+from django.conf import settings
 from django.db.utils import IntegrityError
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import filters, status
+from rest_framework import filters, generics, status
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.export import EXPORT_CONTENT_TYPES, EXPORT_FORMATS, export_lines
+from reviews.leaderboards import GROUP_MODELS
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry,
+                            Review, Title, TitleStats, User)
 
 from .filters import TitleFilter
-from .mixins import CreateDestroyListMixin
+from .mixins import (CachedListMixin, ConditionalReadMixin,
+                     CreateDestroyListMixin, SerializationMetricsMixin,
+                     ValuesListMixin)
+from .pagination import LimitOffsetKeysetPagination
 from .permissions import (IsAdmin, IsAdminUserOrReadOnly,
                           IsAuthorAdminModeratorOrReadOnly)
 from .serializers import (AccountSerializer, CategorySerializer,
-                          CommentSerializer, GenreSerializer, ReviewSerializer,
-                          SignUpSerializer, TitleReadSerializer,
-                          TitleWriteSerializer, TokenSerializer,
-                          UserSerializer)
+                          CommentSerializer, CommentValuesSerializer,
+                          GenreSerializer, LeaderboardSerializer,
+                          ReviewBulkSerializer, ReviewSerializer,
+                          ReviewValuesSerializer, SignUpSerializer,
+                          TitleBulkSerializer, TitleReadSerializer,
+                          TitleStatsSerializer,
+                          TitleValuesSerializer, TitleWriteSerializer,
+                          TokenSerializer, UserSerializer, stats_requested)
 from .utils import create_confirmation_code, get_tokens_for_user, send_email
 
-
-class CategoryGenreViewSet(CreateDestroyListMixin, GenericViewSet):
+REVIEW_FIELDS = (
+    "id",
+    "text",
+    "score",
+    "pub_date",
+    "title_id",
+    "author__username",
+)
+COMMENT_FIELDS = (
+    "id",
+    "text",
+    "pub_date",
+    "review_id",
+    "author__username",
+)
+
+
+class CategoryGenreViewSet(
+    SerializationMetricsMixin,
+    CachedListMixin,
+    CreateDestroyListMixin,
+    GenericViewSet,
+):
     """Базовый класс для CategoryViewSet и GenreViewSet."""
 
     permission_classes = (IsAdminUserOrReadOnly,)
@@ -83,7 +116,48 @@ def user_auth(request):
     return Response(response, status=status.HTTP_200_OK)
 
 
-class UsersViewSet(ModelViewSet):
+@api_view(["POST"])
+@permission_classes([IsAdmin])
+def reviews_bulk(request):
+    """Создает список отзывов от имени указанных авторов (для админа)."""
+    serializer = ReviewBulkSerializer(data=request.data, many=True)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def leaderboard(request, kind, slug):
+    """
+    Топ произведений категории или жанра по взвешенному рейтингу
+    (reviews.leaderboards), ?limit= - число мест.
+    """
+    group = get_object_or_404(GROUP_MODELS[kind], slug=slug)
+    size = settings.LEADERBOARD_SIZE
+    try:
+        limit = int(request.query_params.get("limit", size))
+        if not 0 < limit <= size:
+            raise ValueError
+    except ValueError:
+        raise ValidationError(
+            {"limit": [f"Ожидается целое число от 1 до {size}."]}
+        )
+    entries = list(
+        LeaderboardEntry.objects.filter(kind=kind, group_id=group.pk)
+        .select_related("title")
+        .order_by("position")[:limit]
+    )
+    return Response(LeaderboardSerializer({
+        "kind": kind,
+        "group": group,
+        "min_votes": settings.LEADERBOARD_MIN_VOTES,
+        "refreshed_at": entries[0].refreshed_at if entries else None,
+        "results": entries,
+    }).data)
+
+
+class UsersViewSet(SerializationMetricsMixin, ModelViewSet):
     """Обработка профиля пользователя."""
 
     queryset = User.objects.all()
@@ -101,12 +175,14 @@ class UsersViewSet(ModelViewSet):
     )
     def me(self, request):
         """Вывод профиля, добавление новых пользователей."""
+        # request.user из кеша аутентификации загружен не полностью.
+        user = get_object_or_404(User, pk=request.user.pk)
         if self.request.method != "PATCH":
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
 
         serializer = self.get_serializer(
-            request.user,
+            user,
             data=request.data,
             partial=True
         )
@@ -129,33 +205,120 @@ class GenreViewSet(CategoryGenreViewSet):
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(
+    SerializationMetricsMixin,
+    ConditionalReadMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """Обрабатывает запрос к произведениям."""
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score")).all()
-    ordering = ["-rating", "name"]
+    queryset = (
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
+        .order_by("-rating", "name", "pk")
+    )
+    keyset_ordering = ("-rating", "name", "pk")
+    values_serializer_class = TitleValuesSerializer
+    pagination_class = LimitOffsetKeysetPagination
     permission_classes = (IsAdminUserOrReadOnly,)
     filterset_class = TitleFilter
 
+    def get_queryset(self):
+        if stats_requested(self.request):
+            return self.queryset.select_related("stats")
+        return super().get_queryset()
+
     def get_serializer_class(self):
         """Выбор сериалайзера в зависимости от типа запроса."""
         if self.action in ("list", "retrieve"):
             return TitleReadSerializer
+        if self.action == "stats":
+            return TitleStatsSerializer
+        if self.action == "bulk":
+            return TitleBulkSerializer
         return TitleWriteSerializer
 
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """
+        Гистограмма оценок, число отзывов и дата последнего отзыва
+        произведения - из TitleStats, без чтения таблицы отзывов.
+        """
+        return self.conditional_response(self.stats_response, request, pk)
+
+    def stats_response(self, request, pk):
+        title = generics.get_object_or_404(
+            Title.objects.select_related("stats").only("id", "stats"), pk=pk
+        )
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            stats = TitleStats.for_title(title.pk)
+        return Response(self.get_serializer(stats).data)
+
+    @action(detail=False, methods=["get"], permission_classes=(IsAdmin,))
+    def export(self, request):
+        """
+        Потоковая выгрузка всех произведений: ?output=ndjson|csv,
+        ?reviews=1 - вместе с отзывами.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            formats = ", ".join(EXPORT_FORMATS)
+            raise ValidationError(
+                {"output": [f"Допустимые форматы: {formats}."]}
+            )
+        include_reviews = request.query_params.get("reviews") in ("1", "true")
+        response = StreamingHttpResponse(
+            export_lines(output, include_reviews),
+            content_type=EXPORT_CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="titles.{output}"'
+        )
+        return response
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Создает список произведений одним запросом."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(
+    SerializationMetricsMixin,
+    ConditionalReadMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """Обрабатывает запрос к обзорам."""
 
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
+    keyset_ordering = ("-pub_date", "-pk")
+    pagination_class = LimitOffsetKeysetPagination
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorAdminModeratorOrReadOnly,
     )
 
+    def get_version_scopes(self):
+        return (
+            (Review, None),
+            (Review, int(self.kwargs.get("title_id"))),
+            (User, None),
+        )
+
     def get_title(self):
-        """Получает из запроса объект Title."""
-        return get_object_or_404(Title, id=self.kwargs.get("title_id"))
+        """Получает из запроса объект Title (один раз за запрос)."""
+        if not hasattr(self, "_title"):
+            self._title = get_object_or_404(
+                Title.objects.only("id"), id=self.kwargs.get("title_id")
+            )
+        return self._title
 
     def perform_create(self, serializer):
         """
@@ -166,36 +329,54 @@ class ReviewViewSet(ModelViewSet):
 
     def get_queryset(self):
         """Возвращает список обзоров к произведению."""
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related("author").only(
+            *REVIEW_FIELDS
+        )
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(
+    SerializationMetricsMixin,
+    ConditionalReadMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """Обрабатывает запрос к комментариям."""
 
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    keyset_ordering = ("-pub_date", "-pk")
+    pagination_class = LimitOffsetKeysetPagination
     permission_classes = (
         IsAuthorAdminModeratorOrReadOnly,
         IsAuthenticatedOrReadOnly,
     )
 
-    def get_review(self):
-        """Возвращает обзор с запрашиваемым id."""
-        return get_object_or_404(
-            Review,
-            title_id=self.kwargs.get("title_id"),
-            pk=self.kwargs.get("review_id"),
+    def get_version_scopes(self):
+        return (
+            (Comment, None),
+            (Comment, int(self.kwargs.get("review_id"))),
+            (User, None),
         )
 
+    def get_review(self):
+        """Возвращает обзор с запрашиваемым id (один раз за запрос)."""
+        if not hasattr(self, "_review"):
+            self._review = get_object_or_404(
+                Review.objects.only("id", "title_id"),
+                title_id=self.kwargs.get("title_id"),
+                pk=self.kwargs.get("review_id"),
+            )
+        return self._review
+
     def perform_create(self, serializer):
         """
         Создает комментарий к обзору.
         Автором комментария автоматически устанавливается пользователь.
         """
-        serializer.save(
-            author=self.request.user,
-            review_id=self.get_review().id
-        )
+        serializer.save(author=self.request.user, review=self.get_review())
 
     def get_queryset(self):
         """Возвращает список комментариев к обзору."""
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related("author").only(
+            *COMMENT_FIELDS
+        )
@@ -1,7 +1,19 @@
+"""
+ASGI config for YaMDb project.
+
+Запуск: uvicorn api_yamdb.asgi:application
+или gunicorn -k uvicorn.workers.UvicornWorker api_yamdb.asgi:application.
+Чтение произведений, отзывов и комментариев обслуживается асинхронно,
+см. api.asgi.
+"""
+
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+django.setup(set_prefix=False)
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+from api.asgi import Application  # noqa: E402
 
-application = get_asgi_application()
+application = Application()
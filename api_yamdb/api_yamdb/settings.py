@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.metrics.MetricsMiddleware",
+    "api.replicas.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,6 +86,66 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения (api.replicas): DB_REPLICA_HOSTS=host1,host2.
+# В тестах реплики смотрят в тестовую базу default.
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", default="").split(",")), 1
+):
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["api.replicas.ReplicaRouter"]
+
+# Сколько секунд после записи чтение пользователя идет с default
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", default=5))
+
+# Cache
+
+# Кеш должен быть общим для всех воркеров (проверка api.E001): в нем
+# версии данных для ETag, кеш списков и пользователей, привязки к default.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.memcached.MemcachedCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default="memcached:11211"),
+    }
+}
+
+# Сколько секунд кешируется пользователь токена (api.authentication):
+# дольше этого не проживет роль, если версия пользователя потеряется
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", default=60))
+
+# Время жизни кеша списков категорий и жанров, в секундах
+LISTING_CACHE_TTL = int(os.getenv("LISTING_CACHE_TTL", default=300))
+
+# Списки произведений, отзывов и комментариев (api.pagination): до
+# скольких строк count точный и сколько живет кешированный count больше
+COUNT_EXACT_LIMIT = int(os.getenv("COUNT_EXACT_LIMIT", default=10000))
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", default=300))
+
+# Топы произведений (reviews.leaderboards): мест в топе и число оценок,
+# с которым рейтинг произведения весит столько же, сколько средний
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", default=100))
+LEADERBOARD_MIN_VOTES = int(os.getenv("LEADERBOARD_MIN_VOTES", default=10))
+
+# Метрики: как часто воркер пишет свой снимок в кеш, сколько живут снимок
+# и отметка воркера, и токен для /metrics (если пустой, эндпоинт - 404)
+METRICS_FLUSH_INTERVAL = int(os.getenv("METRICS_FLUSH_INTERVAL", default=5))
+METRICS_WORKER_TTL = int(os.getenv("METRICS_WORKER_TTL", default=3600))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", default="")
+
+# Потоки ASGI-процесса для чтения произведений, отзывов и комментариев
+# (api.asgi); у каждого потока свое соединение с базой
+ASGI_READ_THREADS = int(os.getenv("ASGI_READ_THREADS", default=10))
+
 
 AUTH_USER_MODEL = "reviews.User"
 
@@ -130,9 +192,19 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    # orjson, если установлен; без него - стандартный json, вывод тот же
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
 }
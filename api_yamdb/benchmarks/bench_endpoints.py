@@ -0,0 +1,133 @@
+import math
+from itertools import count
+from time import perf_counter
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Genre, Review, Title, User
+
+from .seed import ADMIN_USERNAME, CONFIRMATION_CODE, TOKEN_USERNAME
+
+pytestmark = pytest.mark.django_db
+
+signup_numbers = count()
+
+
+def signup_data():
+    number = next(signup_numbers)
+    return {
+        "username": f"signup{number}",
+        "email": f"signup{number}@bench.yamdb",
+    }
+
+
+def percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def measure(client, method, url, rounds, data=None):
+    """p50/p99 времени ответа и число SQL-запросов маршрута."""
+    timings = []
+    for _ in range(rounds):
+        payload = data() if callable(data) else data
+        with CaptureQueriesContext(connection) as queries:
+            started = perf_counter()
+            response = getattr(client, method)(url, payload)
+            timings.append((perf_counter() - started) * 1000)
+        assert response.status_code < 400, response.content
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "queries": len(queries),
+    }
+
+
+@pytest.fixture
+def admin_client():
+    client = APIClient()
+    admin = User.objects.get(username=ADMIN_USERNAME)
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}"
+    )
+    return client
+
+
+def routes():
+    title = Title.objects.order_by("-rating_count", "id").first()
+    review = Review.objects.filter(title=title).order_by("id").first()
+    genre = Genre.objects.order_by("id").first()
+    category = Category.objects.order_by("id").first()
+    # Слово из названия засеянного произведения: поиск находит строки.
+    name = title.name.split()[0]
+    reviews = f"/api/v1/titles/{title.id}/reviews/"
+    comments = f"{reviews}{review.id}/comments/"
+    return {
+        "titles-list": ("get", "/api/v1/titles/", None),
+        "titles-list-limit-100": ("get", "/api/v1/titles/?limit=100", None),
+        "titles-list-deep-offset": (
+            "get",
+            f"/api/v1/titles/?offset={max(Title.objects.count() - 10, 0)}",
+            None,
+        ),
+        "titles-filter-genre": (
+            "get", f"/api/v1/titles/?genre={genre.slug}", None
+        ),
+        "titles-filter-category": (
+            "get", f"/api/v1/titles/?category={category.slug}", None
+        ),
+        "titles-filter-name": ("get", f"/api/v1/titles/?name={name}", None),
+        "titles-filter-year": ("get", "/api/v1/titles/?year=2000", None),
+        "titles-retrieve": ("get", f"/api/v1/titles/{title.id}/", None),
+        "titles-stats": ("get", f"/api/v1/titles/{title.id}/stats/", None),
+        "reviews-list": ("get", reviews, None),
+        "reviews-retrieve": ("get", f"{reviews}{review.id}/", None),
+        "comments-list": ("get", comments, None),
+        "leaderboard-category": (
+            "get", f"/api/v1/leaderboards/categories/{category.slug}/", None
+        ),
+        "categories-list": ("get", "/api/v1/categories/", None),
+        "genres-list": ("get", "/api/v1/genres/", None),
+        "users-list": ("get", "/api/v1/users/", None),
+        "signup": ("post", "/api/v1/auth/signup/", signup_data),
+        "token": ("post", "/api/v1/auth/token/", {
+            "username": TOKEN_USERNAME,
+            "confirmation_code": CONFIRMATION_CODE,
+        }),
+    }
+
+
+ROUTES = (
+    "titles-list",
+    "titles-list-limit-100",
+    "titles-list-deep-offset",
+    "titles-filter-genre",
+    "titles-filter-category",
+    "titles-filter-name",
+    "titles-filter-year",
+    "titles-retrieve",
+    "titles-stats",
+    "reviews-list",
+    "reviews-retrieve",
+    "comments-list",
+    "leaderboard-category",
+    "categories-list",
+    "genres-list",
+    "users-list",
+    "signup",
+    "token",
+)
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_route(route, admin_client, record, pytestconfig):
+    method, url, data = routes()[route]
+    stats = measure(
+        admin_client, method, url, pytestconfig.getoption("bench_rounds"),
+        data,
+    )
+    record(route, stats)
@@ -0,0 +1,67 @@
+"""Сравнение api.renderers/api.parsers со стандартными JSON-классами DRF
+на ответе списка произведений с большим limit."""
+
+import io
+from time import perf_counter
+
+import pytest
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .bench_endpoints import percentile
+
+pytestmark = pytest.mark.django_db
+
+LIMIT = 1000
+
+
+def timings(function, rounds):
+    result = []
+    for _ in range(rounds):
+        started = perf_counter()
+        function()
+        result.append((perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(percentile(result, 50), 3),
+        "p99_ms": round(percentile(result, 99), 3),
+        "mean_ms": round(sum(result) / len(result), 3),
+        "queries": 0,
+    }
+
+
+@pytest.fixture(scope="module")
+def titles_page(django_db_setup, django_db_blocker):
+    from rest_framework.test import APIClient
+
+    with django_db_blocker.unblock():
+        response = APIClient().get(f"/api/v1/titles/?limit={LIMIT}")
+    return response.data
+
+
+@pytest.mark.parametrize("renderer", (JSONRenderer, FastJSONRenderer))
+def test_render(renderer, titles_page, record, pytestconfig):
+    expected = JSONRenderer().render(titles_page)
+    assert renderer().render(titles_page) == expected
+    record(
+        f"render-titles-{LIMIT}-{renderer.__name__}",
+        timings(
+            lambda: renderer().render(titles_page),
+            pytestconfig.getoption("bench_rounds"),
+        ),
+    )
+
+
+@pytest.mark.parametrize("parser", (JSONParser, FastJSONParser))
+def test_parse(parser, titles_page, record, pytestconfig):
+    body = JSONRenderer().render(titles_page)
+    expected = JSONParser().parse(io.BytesIO(body))
+    assert parser().parse(io.BytesIO(body)) == expected
+    record(
+        f"parse-titles-{LIMIT}-{parser.__name__}",
+        timings(
+            lambda: parser().parse(io.BytesIO(body)),
+            pytestconfig.getoption("bench_rounds"),
+        ),
+    )
@@ -0,0 +1,128 @@
+"""Бенчмарки эндпоинтов API на заполненной базе.
+
+Запуск (из папки api_yamdb):
+    DB_ENGINE=django.db.backends.sqlite3 DB_NAME=bench.sqlite3 \\
+        pytest benchmarks --bench-titles 1000 --bench-reviews 50000
+Для PostgreSQL достаточно переменных окружения из infra/.env.
+Отчет пишется в --bench-report, а с --bench-baseline каждый маршрут
+сравнивается с прошлым отчетом и падает при регрессии.
+"""
+
+import json
+import platform
+import time
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+
+from .seed import seed
+
+results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    for name, default in (
+        ("users", 1000),
+        ("categories", 10),
+        ("genres", 20),
+        ("titles", 1000),
+        ("reviews", 20000),
+        ("comments", 20000),
+    ):
+        group.addoption(
+            f"--bench-{name}",
+            type=int,
+            default=default,
+            help=f"Количество записей {name} в базе.",
+        )
+    group.addoption(
+        "--bench-rounds", type=int, default=50,
+        help="Сколько раз вызывать каждый маршрут.",
+    )
+    group.addoption(
+        "--bench-report", default="benchmark-report.json",
+        help="Куда записать JSON-отчет.",
+    )
+    group.addoption(
+        "--bench-baseline", default=None,
+        help="Прошлый отчет для поиска регрессий.",
+    )
+    group.addoption(
+        "--bench-tolerance", type=float, default=0.25,
+        help="Допустимый рост p50 относительно --bench-baseline.",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_cache():
+    """Бенчмарки идут в одном процессе: кеш в памяти вместо memcached."""
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }):
+        yield
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(
+    local_cache, django_db_setup, django_db_blocker, pytestconfig
+):
+    volumes = {
+        name: pytestconfig.getoption(f"bench_{name}")
+        for name in (
+            "users", "categories", "genres", "titles", "reviews", "comments"
+        )
+    }
+    started = time.monotonic()
+    with django_db_blocker.unblock():
+        seed(**volumes)
+    results["meta"] = {
+        "vendor": connection.vendor,
+        "python": platform.python_version(),
+        "volumes": volumes,
+        "rounds": pytestconfig.getoption("bench_rounds"),
+        "seed_seconds": round(time.monotonic() - started, 2),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+@pytest.fixture(scope="session")
+def baseline(pytestconfig):
+    path = pytestconfig.getoption("bench_baseline")
+    if not path:
+        return {}
+    with open(path, encoding="utf-8") as report:
+        return json.load(report).get("routes", {})
+
+
+@pytest.fixture
+def record(pytestconfig, baseline):
+    """Сохраняет результат маршрута и сравнивает его с baseline."""
+
+    def record(route, stats):
+        results.setdefault("routes", {})[route] = stats
+        previous = baseline.get(route)
+        if previous is None:
+            return
+        tolerance = pytestconfig.getoption("bench_tolerance")
+        assert stats["queries"] <= previous["queries"], (
+            f"{route}: запросов {stats['queries']}, "
+            f"было {previous['queries']}"
+        )
+        assert stats["p50_ms"] <= previous["p50_ms"] * (1 + tolerance), (
+            f"{route}: p50 {stats['p50_ms']} мс, "
+            f"было {previous['p50_ms']} мс"
+        )
+
+    return record
+
+
+def pytest_sessionfinish(session):
+    if "routes" not in results:
+        return
+    path = session.config.getoption("bench_report")
+    with open(path, "w", encoding="utf-8") as report:
+        json.dump(results, report, ensure_ascii=False, indent=2)
@@ -0,0 +1,132 @@
+"""Нагрузочное сравнение WSGI- и ASGI-запуска на запущенном сервере.
+
+--concurrency клиентов в цикле открывают соединение, отправляют GET
+и читают ответ до конца; по ним считаются rps и p50/p99. Еще
+--slow-clients клиентов параллельно отправляют те же запросы частями
+в течение --slow секунд, как медленная сеть. Синхронный воркер
+gunicorn все это время занят таким соединением, а ASGI-процесс - нет.
+
+Пример (из папки api_yamdb, база заполнена generate_data):
+    gunicorn --workers 3 api_yamdb.wsgi:application &
+    python -m benchmarks.load --url http://127.0.0.1:8000/api/v1/titles/ \\
+        --slow-clients 20
+    gunicorn --workers 3 -k uvicorn.workers.UvicornWorker \\
+        api_yamdb.asgi:application &
+    python -m benchmarks.load --url http://127.0.0.1:8000/api/v1/titles/ \\
+        --slow-clients 20
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from urllib.parse import urlsplit
+
+SLOW_PARTS = 5
+
+
+def percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+async def fetch(host, port, request, slow):
+    """Один запрос; возвращает статус ответа."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if slow:
+            part = len(request) // SLOW_PARTS + 1
+            for start in range(0, len(request), part):
+                writer.write(request[start:start + part])
+                await writer.drain()
+                await asyncio.sleep(slow / SLOW_PARTS)
+        else:
+            writer.write(request)
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def client(url, slow, deadline, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        "Accept: application/json\r\nConnection: close\r\n\r\n"
+    ).encode()
+    if slow:
+        # Медленные клиенты начинают не одновременно.
+        await asyncio.sleep(random.uniform(0, slow))
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            status = await fetch(
+                parts.hostname, parts.port or 80, request, slow
+            )
+        except (OSError, IndexError, ValueError):
+            status = None
+        if status != 200:
+            errors.append(status)
+            continue
+        latencies.append((time.monotonic() - started) * 1000)
+
+
+async def run(url, concurrency, duration, slow_clients, slow):
+    latencies, errors, slow_latencies = [], [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *(
+            client(url, 0, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ),
+        *(
+            client(url, slow, deadline, slow_latencies, errors)
+            for _ in range(slow_clients)
+        ),
+    )
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "slow_clients": slow_clients,
+        "slow_seconds": slow,
+        "requests": len(latencies),
+        "slow_requests": len(slow_latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument(
+        "--slow-clients", type=int, default=0,
+        help="Сколько клиентов отправляют запрос медленно.",
+    )
+    parser.add_argument(
+        "--slow", type=float, default=1,
+        help="За сколько секунд медленный клиент отправляет запрос.",
+    )
+    args = parser.parse_args()
+    result = asyncio.run(
+        run(
+            args.url,
+            args.concurrency,
+            args.duration,
+            args.slow_clients,
+            args.slow,
+        )
+    )
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Заполнение базы для бенчмарков командой generate_data."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from reviews.models import User
+
+ADMIN_USERNAME = "bench_admin"
+TOKEN_USERNAME = "bench_token"
+CONFIRMATION_CODE = "benchmarkcode000"
+
+
+def seed(users, categories, genres, titles, reviews, comments,
+         batch_size=5000, random_seed=0):
+    User.objects.create(
+        username=ADMIN_USERNAME, email="admin@bench.yamdb", role=User.ADMIN
+    )
+    User.objects.create(
+        username=TOKEN_USERNAME,
+        email="token@bench.yamdb",
+        confirmation_code=CONFIRMATION_CODE,
+    )
+    call_command(
+        "generate_data",
+        users=users,
+        categories=categories,
+        genres=genres,
+        titles=titles,
+        reviews=reviews,
+        comments=comments,
+        batch_size=batch_size,
+        seed=random_seed,
+        prefix="bench",
+        stdout=StringIO(),
+    )
+    call_command("refresh_leaderboards", stdout=StringIO())
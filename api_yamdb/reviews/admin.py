@@ -1,10 +1,102 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .counts import bounded_count
+from .models import (Category, Comment, Genre, OutboxEmail, Review, Title,
+                     User)
+
+COUNT_LIMIT = 10000
+FIRST_DECADE = 1900
+EARLIER = 'earlier'
+
+
+class BoundedCountPaginator(Paginator):
+    """
+    Paginator без полного COUNT(*): число строк без фильтров - оценка
+    PostgreSQL, с фильтрами - не больше COUNT_LIMIT (reviews.counts).
+    """
+
+    @cached_property
+    def count(self):
+        return bounded_count(self.object_list, COUNT_LIMIT)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Админка для таблиц на миллионы строк: список по первичному ключу
+    без точного подсчета строк, фильтры без выборки значений из таблицы,
+    связанные объекты выбираются через автодополнение.
+    """
+
+    paginator = BoundedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    empty_value_display = '-пусто-'
+
+
+def is_autocomplete(request):
+    match = request.resolver_match
+    return match is not None and match.url_name.endswith('_autocomplete')
+
+
+class DecadeListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по десятилетиям: варианты не выбираются из таблицы
+    (SELECT DISTINCT year), а выбранное десятилетие - диапазон
+    по индексу title_year_rating_idx.
+    """
+
+    title = 'десятилетие'
+    parameter_name = 'decade'
+
+    def lookups(self, request, model_admin):
+        last = timezone.now().year // 10 * 10
+        decades = [
+            (str(decade), f'{decade}-е')
+            for decade in range(last, FIRST_DECADE - 1, -10)
+        ]
+        return [*decades, (EARLIER, f'до {FIRST_DECADE}')]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == EARLIER:
+            return queryset.filter(year__lt=FIRST_DECADE)
+        if value and value.isdigit():
+            decade = int(value)
+            return queryset.filter(year__gte=decade, year__lt=decade + 10)
+        return queryset
+
+
+class ExactSearchMixin:
+    """
+    Поиск по индексам вместо icontains по связанным таблицам: число
+    ищется в search_id_field, остальное - точным совпадением
+    с одним из search_fields. Автодополнение в полях других моделей
+    ищет число по pk: там выбирают сам объект.
+    """
+
+    search_id_field = 'pk'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            field = (
+                'pk' if is_autocomplete(request) else self.search_id_field
+            )
+            return queryset.filter(**{field: term}), False
+        lookups = Q()
+        for field in self.search_fields:
+            lookups |= Q(**{field: term})
+        return queryset.filter(lookups), False
 
 
 @admin.register(User)
-class UserClass(admin.ModelAdmin):
+class UserClass(LargeTableAdmin):
     """Админка юзеров."""
 
     list_display = (
@@ -40,7 +132,6 @@ class UserClass(admin.ModelAdmin):
         'email',
         'role',
     )
-    empty_value_display = '-пусто-'
 
 
 @admin.register(Genre)
@@ -78,7 +169,7 @@ class CategoryClass(admin.ModelAdmin):
 
 
 @admin.register(Title)
-class TitleClass(admin.ModelAdmin):
+class TitleClass(LargeTableAdmin):
     """Админка произведений."""
 
     list_display = (
@@ -88,8 +179,9 @@ class TitleClass(admin.ModelAdmin):
         'year',
         'category',
     )
+    list_select_related = ('category',)
     list_filter = (
-        'year',
+        DecadeListFilter,
         'category',
         'genre',
     )
@@ -98,17 +190,17 @@ class TitleClass(admin.ModelAdmin):
         'description',
         'year',
     )
-    search_fields = (
-        'year',
+    # icontains по name обслуживает триграммный индекс (reviews.search).
+    search_fields = ('name',)
+    autocomplete_fields = (
         'category',
         'genre',
     )
-    empty_value_display = '-пусто-'
 
 
 @admin.register(Review)
-class ReviewClass(admin.ModelAdmin):
-    """Админка обзоров."""
+class ReviewClass(ExactSearchMixin, LargeTableAdmin):
+    """Админка обзоров: поиск по id произведения или имени автора."""
 
     list_display = (
         'pk',
@@ -118,40 +210,52 @@ class ReviewClass(admin.ModelAdmin):
         'score',
         'pub_date',
     )
-    list_filter = (
-        'title_id',
-        'author',
-        'pub_date',
-    )
+    list_select_related = ('author',)
+    list_filter = ('pub_date',)
     list_editable = ('text',)
-    search_fields = (
+    search_id_field = 'title_id'
+    search_fields = ('author__username',)
+    autocomplete_fields = (
         'title',
         'author',
-        'pub_date',
     )
-    empty_value_display = '-пусто-'
 
 
 @admin.register(Comment)
-class CommentClass(admin.ModelAdmin):
-    """Админка комментов."""
+class CommentClass(ExactSearchMixin, LargeTableAdmin):
+    """Админка комментов: поиск по id обзора или имени автора."""
 
     list_display = (
         'pk',
         'text',
-        'review',
-        'author',
-        'pub_date',
-    )
-    list_filter = (
-        'review',
+        'review_id',
         'author',
         'pub_date',
     )
+    list_select_related = ('author',)
+    list_filter = ('pub_date',)
     list_editable = ('text',)
-    search_fields = (
+    search_id_field = 'review_id'
+    search_fields = ('author__username',)
+    autocomplete_fields = (
         'review',
         'author',
-        'pub_date',
     )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailClass(admin.ModelAdmin):
+    """Админка очереди писем."""
+
+    list_display = (
+        'pk',
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('recipient',)
     empty_value_display = '-пусто-'
@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import install_title_search
+
+        post_migrate.connect(install_title_search, sender=self)
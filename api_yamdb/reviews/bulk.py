@@ -0,0 +1,78 @@
+"""Пакетная запись строк: COPY на PostgreSQL, executemany одного INSERT
+на остальных базах. В отличие от bulk_create, SQL не собирается заново
+для каждой пачки, а id созданных объектов не возвращаются.
+Сигналы моделей при такой записи не вызываются."""
+
+import io
+
+from django.core.management.color import no_style
+from django.db import connections
+
+
+def insert_batch(model, batch, using="default"):
+    """Записывает пачку объектов model самым быстрым способом для базы."""
+    if connections[using].vendor == "postgresql":
+        copy_batch(model, batch, using)
+    else:
+        executemany_batch(model, batch, using)
+
+
+def batch_rows(model, batch, connection):
+    """Поля для записи и значения пачки в формате базы."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and batch[0].pk is None)
+    ]
+    rows = [
+        [
+            field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+            for field in fields
+        ]
+        for obj in batch
+    ]
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    return quote_name(model._meta.db_table), columns, rows
+
+
+def executemany_batch(model, batch, using="default"):
+    """Один INSERT с параметрами для всей пачки."""
+    connection = connections[using]
+    table, columns, rows = batch_rows(model, batch, connection)
+    placeholders = ", ".join(["%s"] * len(rows[0]))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows
+        )
+
+
+def copy_batch(model, batch, using="default"):
+    """Передает пачку в PostgreSQL одной командой COPY."""
+    connection = connections[using]
+    table, columns, rows = batch_rows(model, batch, connection)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({columns}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def copy_value(value):
+    """Кодирует значение для COPY: пустое поле без кавычек - NULL."""
+    if value is None:
+        return ""
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def reset_sequences(model, using="default"):
+    """Сдвигает счетчик id таблицы за максимальный id."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+            cursor.execute(sql)
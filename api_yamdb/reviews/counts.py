@@ -0,0 +1,37 @@
+"""Подсчет строк больших таблиц без полного COUNT(*).
+
+Без фильтров число строк берется из статистики планировщика PostgreSQL
+(pg_class.reltuples), которую обновляют VACUUM и ANALYZE. С фильтрами
+строки считаются не дальше заданного предела: COUNT(*) по подзапросу
+с LIMIT. Маленькие таблицы и другие СУБД считаются точно.
+"""
+
+from django.db import connections
+
+ESTIMATE_SQL = "SELECT reltuples FROM pg_class WHERE oid = %s::regclass"
+
+
+def estimated_count(model, using):
+    """Оценка числа строк таблицы модели или None, если ее нет."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(ESTIMATE_SQL, [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 - таблицу еще не анализировали.
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def bounded_count(queryset, limit):
+    """
+    Число строк queryset, но не больше limit; для запроса без фильтров
+    больше limit - оценка по статистике.
+    """
+    if not queryset.query.where:
+        estimate = estimated_count(queryset.model, queryset.db)
+        if estimate is not None and estimate > limit:
+            return estimate
+    return queryset.order_by()[:limit].count()
@@ -0,0 +1,128 @@
+"""Топы произведений по категориям и жанрам.
+
+Место в топе определяет взвешенный рейтинг (байесовское среднее):
+(сумма оценок + m * C) / (число оценок + m), где m - LEADERBOARD_MIN_VOTES,
+а C - средняя оценка по всем отзывам. Пока у произведения мало оценок,
+его рейтинг близок к среднему, поэтому одна десятка не поднимает его
+на первое место.
+
+Топы хранятся в LeaderboardEntry по LEADERBOARD_SIZE мест на группу
+и пересобираются командой refresh_leaderboards: полностью или только
+для групп с произведениями, измененными после прошлого обновления
+(Title.changed_at). Чтение топа - выборка по индексу без сортировки.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Max, Sum
+from django.utils import timezone
+
+from .models import Category, Genre, LeaderboardEntry, Title
+
+GROUP_MODELS = {
+    LeaderboardEntry.CATEGORY: Category,
+    LeaderboardEntry.GENRE: Genre,
+}
+GROUP_FILTERS = {
+    LeaderboardEntry.CATEGORY: "category_id",
+    LeaderboardEntry.GENRE: "genre",
+}
+
+
+def mean_score():
+    """Средняя оценка по всем отзывам (C)."""
+    totals = Title.objects.aggregate(
+        score_sum=Sum("rating_sum"), score_count=Sum("rating_count")
+    )
+    if not totals["score_count"]:
+        return 0.0
+    return totals["score_sum"] / totals["score_count"]
+
+
+def weighted_rating(min_votes, mean):
+    return ExpressionWrapper(
+        (F("rating_sum") + min_votes * mean) * 1.0
+        / (F("rating_count") + min_votes),
+        output_field=FloatField(),
+    )
+
+
+def refresh_group(kind, group_id, mean, refreshed_at):
+    """Пересобирает топ одной категории или жанра."""
+    ranked = Title.objects.filter(
+        rating_count__gt=0, **{GROUP_FILTERS[kind]: group_id}
+    ).annotate(
+        weighted=weighted_rating(settings.LEADERBOARD_MIN_VOTES, mean)
+    ).order_by("-weighted", "pk").values_list("pk", "weighted")
+    entries = [
+        LeaderboardEntry(
+            kind=kind,
+            group_id=group_id,
+            position=position,
+            title_id=title_id,
+            weighted_rating=weighted,
+            refreshed_at=refreshed_at,
+        )
+        for position, (title_id, weighted) in enumerate(
+            ranked[:settings.LEADERBOARD_SIZE], 1
+        )
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(
+            kind=kind, group_id=group_id
+        ).delete()
+        LeaderboardEntry.objects.bulk_create(entries)
+
+
+def all_groups():
+    return {
+        (kind, group_id)
+        for kind, model in GROUP_MODELS.items()
+        for group_id in model.objects.values_list("pk", flat=True)
+    }
+
+
+def changed_groups(since):
+    """Группы, где есть произведения, измененные после since."""
+    changed = Title.objects.filter(changed_at__gt=since)
+    groups = {
+        (LeaderboardEntry.CATEGORY, category_id)
+        for category_id in changed.exclude(category=None)
+        .values_list("category_id", flat=True).distinct()
+    }
+    groups.update(
+        (LeaderboardEntry.GENRE, genre_id)
+        for genre_id in Title.genre.through.objects.filter(
+            title__in=changed
+        ).values_list("genre_id", flat=True).distinct()
+    )
+    # Произведение могло уйти из категории или жанра.
+    groups.update(
+        LeaderboardEntry.objects.filter(title__in=changed)
+        .values_list("kind", "group_id").distinct()
+    )
+    return groups
+
+
+def refresh_leaderboards(full=False):
+    """
+    Обновляет топы и возвращает число пересобранных групп.
+    Без full обновляются только группы с изменениями после прошлого
+    обновления; если топов еще нет, они строятся полностью.
+    """
+    refreshed_at = timezone.now()
+    since = LeaderboardEntry.objects.aggregate(
+        last=Max("refreshed_at")
+    )["last"]
+    if full or since is None:
+        groups = all_groups()
+        for kind, model in GROUP_MODELS.items():
+            LeaderboardEntry.objects.filter(kind=kind).exclude(
+                group_id__in=model.objects.values("pk")
+            ).delete()
+    else:
+        groups = changed_groups(since)
+    mean = mean_score()
+    for kind, group_id in sorted(groups):
+        refresh_group(kind, group_id, mean, refreshed_at)
+    return len(groups)
@@ -0,0 +1,46 @@
+"""Выгрузка каталога произведений с рейтингами в NDJSON или CSV.
+Строки пишутся по мере чтения из базы (см. reviews.export),
+поэтому память не растет с размером каталога."""
+
+from django.core.management.base import BaseCommand
+from reviews.export import CHUNK_SIZE, EXPORT_FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка произведений с категориями, жанрами и рейтингами'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-format',
+            choices=EXPORT_FORMATS,
+            default='ndjson',
+            help='Формат выгрузки.',
+        )
+        parser.add_argument(
+            '--reviews',
+            action='store_true',
+            help='Добавить отзывы к произведениям.',
+        )
+        parser.add_argument(
+            '--file',
+            help='Файл для выгрузки, по умолчанию stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        lines = export_lines(
+            options['output_format'],
+            options['reviews'],
+            options['chunk_size'],
+        )
+        if not options['file']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['file'], 'w', encoding='utf-8', newline='') as file:
+            file.writelines(lines)
@@ -0,0 +1,387 @@
+"""Генерация синтетических данных для нагрузочных тестов.
+
+Создает пользователей, категории, жанры, произведения с жанрами,
+отзывы (не больше одного от автора на произведение) и комментарии.
+Популярность произведений, отзывов, категорий, жанров и активность
+пользователей распределены по закону Ципфа с показателем --skew:
+немногие произведения собирают большую часть отзывов.
+
+Записи пишутся пачками через reviews.bulk (COPY на PostgreSQL).
+Отзывы и комментарии создаются частями по CHUNK_TITLES произведений,
+у каждой части свой генератор случайных чисел от --seed, поэтому
+результат не зависит от числа процессов --workers (только PostgreSQL,
+процессы запускаются через fork). Сигналы при записи не вызываются,
+поэтому рейтинги и статистика произведений пересчитываются для каждой
+части, а версии данных для кешей сбрасываются в конце."""
+
+import multiprocessing
+import random
+import time
+from itertools import accumulate, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from reviews.bulk import insert_batch
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats, User)
+from reviews.versions import bump_version
+
+CHUNK_TITLES = 500
+COMMENTS_STEP = 1000
+MAX_GENRES_PER_TITLE = 3
+WORDS = (
+    'книга', 'фильм', 'песня', 'сюжет', 'герой', 'автор', 'финал',
+    'начало', 'музыка', 'образ', 'сцена', 'глава', 'роль', 'идея',
+    'отличный', 'скучный', 'сильный', 'слабый', 'новый', 'старый',
+    'очень', 'совсем', 'немного', 'снова', 'всегда', 'никогда',
+    'понравился', 'удивил', 'разочаровал', 'запомнился', 'затянут',
+)
+
+worker_state = {}
+
+
+def zipf_cum_weights(size, skew):
+    """Накопленные веса рангов 1..size для random.choices."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+
+def words(rnd, low, high):
+    return ' '.join(rnd.choices(WORDS, k=rnd.randint(low, high)))
+
+
+def write_batches(model, objects, batch_size):
+    """Пишет объекты пачками и возвращает их количество."""
+    objects = iter(objects)
+    total = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return total
+        insert_batch(model, batch)
+        total += len(batch)
+
+
+def last_pk(model):
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def created_pks(model, after):
+    return list(
+        model.objects.filter(pk__gt=after)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def init_worker(state):
+    worker_state.update(state)
+
+
+def pick_authors(rnd, count):
+    """count разных авторов с перекосом в сторону активных."""
+    user_pks = worker_state['user_pks']
+    if count * 10 > len(user_pks):
+        return sorted(rnd.sample(user_pks, count))
+    authors = set()
+    while len(authors) < count:
+        authors.update(rnd.choices(
+            user_pks,
+            cum_weights=worker_state['user_weights'],
+            k=count - len(authors),
+        ))
+    return sorted(authors)
+
+
+def generate_chunk(task):
+    """Отзывы и комментарии для части произведений."""
+    index, title_pks, review_counts, comments = task
+    rnd = random.Random(f'{worker_state["seed"]}:{index}')
+    batch_size = worker_state['batch_size']
+
+    def reviews():
+        for title_pk, count in zip(title_pks, review_counts):
+            quality = rnd.uniform(3, 9)
+            for author_pk in pick_authors(rnd, count):
+                yield Review(
+                    title_id=title_pk,
+                    author_id=author_pk,
+                    text=words(rnd, 5, 60),
+                    score=min(10, max(1, round(rnd.gauss(quality, 2)))),
+                )
+
+    def chunk_comments(review_pks):
+        order = rnd.sample(review_pks, len(review_pks))
+        weights = zipf_cum_weights(len(order), worker_state['skew'])
+        for start in range(0, comments, COMMENTS_STEP):
+            size = min(COMMENTS_STEP, comments - start)
+            authors = rnd.choices(
+                worker_state['user_pks'],
+                cum_weights=worker_state['user_weights'],
+                k=size,
+            )
+            targets = rnd.choices(order, cum_weights=weights, k=size)
+            for review_pk, author_pk in zip(targets, authors):
+                yield Comment(
+                    review_id=review_pk,
+                    author_id=author_pk,
+                    text=words(rnd, 3, 30),
+                )
+
+    with transaction.atomic():
+        created_reviews = write_batches(Review, reviews(), batch_size)
+        review_pks = list(
+            Review.objects.filter(
+                title_id__gte=title_pks[0], title_id__lte=title_pks[-1]
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+        created_comments = 0
+        if review_pks and comments:
+            created_comments = write_batches(
+                Comment, chunk_comments(review_pks), batch_size
+            )
+        chunk_titles = Title.objects.filter(
+            pk__gte=title_pks[0], pk__lte=title_pks[-1]
+        )
+        Title.refresh_ratings(chunk_titles)
+        TitleStats.refresh(chunk_titles)
+    return created_reviews, created_comments
+
+
+class Command(BaseCommand):
+    DONE_MESSAGE = (
+        '{label}: {rows} строк за {seconds:.2f} с ({speed:.0f} строк/с).'
+    )
+    SQLITE_WORKERS_MESSAGE = (
+        'SQLite не поддерживает параллельную запись, '
+        'используйте --workers 1.'
+    )
+
+    help = 'Генерация синтетических данных для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 20),
+            ('genres', 50),
+            ('titles', 10000),
+            ('reviews', 200000),
+            ('comments', 200000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Количество записей {name}.',
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковое зерно дает одинаковые данные.',
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Показатель распределения Ципфа, 0 - равномерно.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов для отзывов и комментариев.',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='gen',
+            help='Префикс имен пользователей и слагов.',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] > 1 and connection.vendor == 'sqlite':
+            raise CommandError(self.SQLITE_WORKERS_MESSAGE)
+        self.rnd = random.Random(options['seed'])
+        self.options = options
+        prefix = options['prefix']
+
+        user_pks = self.create(User, options['users'], lambda number: User(
+            username=f'{prefix}{number}',
+            email=f'{prefix}{number}@example.com',
+        ))
+        category_pks = self.create(
+            Category,
+            options['categories'],
+            lambda number: Category(
+                name=f'Категория {number}',
+                slug=f'{prefix}-category-{number}',
+            ),
+        )
+        genre_pks = self.create(
+            Genre,
+            options['genres'],
+            lambda number: Genre(
+                name=f'Жанр {number}', slug=f'{prefix}-genre-{number}'
+            ),
+        )
+        category_weights = self.ranked_weights(category_pks)
+        title_pks = self.create(Title, options['titles'], lambda number: Title(
+            name=words(self.rnd, 1, 4).capitalize(),
+            year=max(1900, 2022 - int(self.rnd.expovariate(1 / 15))),
+            category_id=self.rnd.choices(
+                category_pks, cum_weights=category_weights
+            )[0] if category_pks else None,
+        ))
+        self.create_title_genres(title_pks, genre_pks)
+        self.create_reviews_comments(title_pks, user_pks)
+
+        for model in (User, Category, Genre, Title, Review, Comment):
+            bump_version(model)
+
+    def ranked_weights(self, pks):
+        """Перемешивает pks на месте: ранг по Ципфу не совпадает с id."""
+        self.rnd.shuffle(pks)
+        return zipf_cum_weights(len(pks), self.options['skew'])
+
+    def report(self, label, rows, started):
+        seconds = time.monotonic() - started
+        self.stdout.write(
+            self.DONE_MESSAGE.format(
+                label=label,
+                rows=rows,
+                seconds=seconds,
+                speed=rows / seconds if seconds else rows,
+            )
+        )
+
+    def create(self, model, count, build):
+        """Создает count объектов model и возвращает их id."""
+        started = time.monotonic()
+        after = last_pk(model)
+        with transaction.atomic():
+            write_batches(
+                model,
+                (build(number) for number in range(count)),
+                self.options['batch_size'],
+            )
+        pks = created_pks(model, after)
+        self.report(model._meta.model_name, len(pks), started)
+        return pks
+
+    def create_title_genres(self, title_pks, genre_pks):
+        if not genre_pks:
+            return
+        started = time.monotonic()
+        ranked = genre_pks[:]
+        weights = self.ranked_weights(ranked)
+        per_title = min(MAX_GENRES_PER_TITLE, len(genre_pks))
+
+        def links():
+            for title_pk in title_pks:
+                count = self.rnd.randint(1, per_title)
+                chosen = set()
+                while len(chosen) < count:
+                    chosen.update(self.rnd.choices(
+                        ranked, cum_weights=weights, k=count - len(chosen)
+                    ))
+                for genre_pk in sorted(chosen):
+                    yield Title.genre.through(
+                        title_id=title_pk, genre_id=genre_pk
+                    )
+
+        with transaction.atomic():
+            rows = write_batches(
+                Title.genre.through, links(), self.options['batch_size']
+            )
+        self.report('title_genre', rows, started)
+
+    def allocate(self, total, shares, cap):
+        """
+        Делит total между позициями пропорционально shares, но не больше
+        cap на позицию: излишек популярных позиций достается остальным.
+        """
+        counts = [0] * len(shares)
+        open_positions = range(len(shares))
+        while total > 0 and open_positions:
+            weight = sum(shares[position] for position in open_positions)
+            given = 0
+            for position in open_positions:
+                extra = min(
+                    cap - counts[position],
+                    int(total * shares[position] / weight + self.rnd.random()),
+                )
+                counts[position] += extra
+                given += extra
+            if not given:
+                break
+            total -= given
+            open_positions = [
+                position for position in open_positions
+                if counts[position] < cap
+            ]
+        return counts
+
+    def create_reviews_comments(self, title_pks, user_pks):
+        options = self.options
+        if not title_pks or not user_pks:
+            return
+        started = time.monotonic()
+        title_pks = sorted(title_pks)
+        ranked = title_pks[:]
+        weights = self.ranked_weights(ranked)
+        shares = dict(zip(ranked, (
+            weight - previous
+            for previous, weight in zip([0] + weights, weights)
+        )))
+        review_counts = self.allocate(
+            options['reviews'],
+            [shares[pk] for pk in title_pks],
+            len(user_pks),
+        )
+        total_reviews = sum(review_counts) or 1
+        tasks = []
+        done = 0
+        for index, start in enumerate(
+            range(0, len(title_pks), CHUNK_TITLES)
+        ):
+            counts = review_counts[start:start + CHUNK_TITLES]
+            comments = (
+                options['comments'] * (done + sum(counts)) // total_reviews
+                - options['comments'] * done // total_reviews
+            )
+            done += sum(counts)
+            tasks.append((
+                index, title_pks[start:start + CHUNK_TITLES], counts, comments
+            ))
+
+        user_weights = self.ranked_weights(user_pks)
+        state = {
+            'seed': options['seed'],
+            'skew': options['skew'],
+            'batch_size': options['batch_size'],
+            'user_pks': user_pks,
+            'user_weights': user_weights,
+        }
+        if options['workers'] > 1:
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(
+                options['workers'], init_worker, (state,)
+            ) as pool:
+                results = pool.map(generate_chunk, tasks)
+        else:
+            init_worker(state)
+            results = [generate_chunk(task) for task in tasks]
+
+        reviews = sum(reviews for reviews, _ in results)
+        comments = sum(comments for _, comments in results)
+        self.report(
+            f'review ({reviews}) и comment ({comments})',
+            reviews + comments,
+            started,
+        )
@@ -2,17 +2,35 @@
 Если поля модели отличаются от полей таблицы,
 укажите оба поля в словаре DIFFERENT_FIELDS -
 первая позиция - поле csv-файла, которое нужно заменить,
-вторая позиция - поле модели для замены."""
+вторая позиция - поле модели для замены.
+
+С флагом --bulk файлы читаются потоково и пишутся пачками
+по --batch-size строк в одной транзакции на файл
+(reviews.bulk: COPY на PostgreSQL, executemany на остальных базах).
+Сигналы моделей при этом не вызываются, поэтому рейтинги
+произведений пересчитываются после загрузки, а версии данных
+моделей для кешей меняются явно."""
 
 import csv
+import time
+from itertools import islice
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.bulk import insert_batch, reset_sequences
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.versions import bump_version
 
 
 class Command(BaseCommand):
     ERROR_MESSAGE = 'Ошибка - {error}, проблема в строке - {row}.'
+    BATCH_ERROR_MESSAGE = 'Ошибка - {error}, проблема в строках {start}-{end}.'
     DONE_MESSAGE = 'Данные из {file} перенесены в таблицу {model}.'
+    BULK_DONE_MESSAGE = (
+        'Данные из {file} перенесены в таблицу {model}: '
+        '{rows} строк за {seconds:.2f} с ({speed:.0f} строк/с).'
+    )
 
     MODELS_FILES = {
         User: 'users.csv',
@@ -31,21 +49,30 @@ class Command(BaseCommand):
 
     help = 'Запись в БД данных из csv-файлов'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Пакетная загрузка: COPY или executemany (reviews.bulk).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке для --bulk.',
+        )
+
     def handle(self, *args, **kwargs):
         for model, file in self.MODELS_FILES.items():
             with open(
                 f'static/data/{file}', 'rt', encoding='utf-8'
             ) as csv_file:
                 csv_reader = csv.DictReader(csv_file)
-                for row in csv_reader:
-                    if model in self.DIFFERENT_FIELDS:
-                        row = {
-                            field_csv.replace(
-                                self.DIFFERENT_FIELDS[model][0],
-                                self.DIFFERENT_FIELDS[model][1],
-                            ): field_table
-                            for field_csv, field_table in row.items()
-                        }
+                rows = (self.rename_fields(model, row) for row in csv_reader)
+                if kwargs['bulk']:
+                    self.bulk_import(model, file, rows, kwargs['batch_size'])
+                    continue
+                for row in rows:
                     try:
                         model.objects.create(**row)
                     except Exception as error:
@@ -58,3 +85,51 @@ class Command(BaseCommand):
                         file=file, model=model._meta.model_name
                     )
                 )
+        if kwargs['bulk']:
+            call_command('recalculate_ratings', verbosity=0)
+
+    def rename_fields(self, model, row):
+        """Переименовывает поля csv-файла в поля модели."""
+        if model not in self.DIFFERENT_FIELDS:
+            return row
+        return {
+            field_csv.replace(
+                self.DIFFERENT_FIELDS[model][0],
+                self.DIFFERENT_FIELDS[model][1],
+            ): field_table
+            for field_csv, field_table in row.items()
+        }
+
+    def bulk_import(self, model, file, rows, batch_size):
+        """Загружает строки пачками и сбрасывает счетчик id таблицы."""
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic():
+            while True:
+                batch = [
+                    model(**row) for row in islice(rows, batch_size)
+                ]
+                if not batch:
+                    break
+                try:
+                    insert_batch(model, batch)
+                except Exception as error:
+                    raise CommandError(
+                        self.BATCH_ERROR_MESSAGE.format(
+                            error=error, start=total + 1,
+                            end=total + len(batch),
+                        )
+                    )
+                total += len(batch)
+            reset_sequences(model)
+        bump_version(model)
+        seconds = time.monotonic() - started
+        self.stdout.write(
+            self.BULK_DONE_MESSAGE.format(
+                file=file,
+                model=model._meta.model_name,
+                rows=total,
+                seconds=seconds,
+                speed=total / seconds if seconds else total,
+            )
+        )
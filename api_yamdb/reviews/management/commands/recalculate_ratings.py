@@ -0,0 +1,110 @@
+"""Пересчет рейтингов произведений по таблице отзывов.
+Сумма и количество оценок хранятся в Title и обновляются
+при сохранении и удалении отзывов. Команда пересобирает их
+с нуля и сообщает о всех найденных расхождениях.
+Статистика отзывов (TitleStats) пересобирается целиком."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from reviews.models import Review, Title, TitleStats
+from reviews.versions import bump_version
+
+
+class Command(BaseCommand):
+    DRIFT_MESSAGE = (
+        'Произведение {id}: сумма {old_sum} -> {new_sum}, '
+        'количество {old_count} -> {new_count}.'
+    )
+    DONE_MESSAGE = 'Найдено расхождений: {drift}, исправлено: {fixed}.'
+    STATS_MESSAGE = 'Статистика пересчитана для {count} произведений.'
+
+    help = 'Пересчет рейтингов произведений с отчетом о расхождениях'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки для обновления.',
+        )
+
+    def get_drifted_titles(self):
+        reviews = Review.objects.filter(title=OuterRef('pk')).order_by()
+        actual_sum = reviews.values('title').annotate(
+            total=Sum('score')
+        ).values('total')
+        actual_count = reviews.values('title').annotate(
+            total=Count('pk')
+        ).values('total')
+        return Title.objects.annotate(
+            actual_sum=Coalesce(
+                Subquery(actual_sum, output_field=IntegerField()), 0
+            ),
+            actual_count=Coalesce(
+                Subquery(actual_count, output_field=IntegerField()), 0
+            ),
+        ).filter(
+            ~Q(rating_sum=F('actual_sum'))
+            | ~Q(rating_count=F('actual_count'))
+            | Q(rating__isnull=True, actual_count__gt=0)
+            | Q(rating__isnull=False, actual_count=0)
+        ).only('pk', 'rating_sum', 'rating_count', 'rating').order_by('pk')
+
+    def handle(self, *args, **options):
+        batch = []
+        drift = fixed = 0
+        for title in self.get_drifted_titles().iterator():
+            drift += 1
+            if options['verbosity']:
+                self.stdout.write(
+                    self.DRIFT_MESSAGE.format(
+                        id=title.pk,
+                        old_sum=title.rating_sum,
+                        new_sum=title.actual_sum,
+                        old_count=title.rating_count,
+                        new_count=title.actual_count,
+                    )
+                )
+            title.rating_sum = title.actual_sum
+            title.rating_count = title.actual_count
+            title.rating = (
+                title.actual_sum / title.actual_count
+                if title.actual_count else None
+            )
+            title.changed_at = timezone.now()
+            batch.append(title)
+            if len(batch) >= options['batch_size']:
+                fixed += self.save_batch(batch, options['dry_run'])
+                batch = []
+        fixed += self.save_batch(batch, options['dry_run'])
+        if options['verbosity']:
+            self.stdout.write(
+                self.DONE_MESSAGE.format(drift=drift, fixed=fixed)
+            )
+        if options['dry_run']:
+            return
+        titles = Title.objects.all()
+        TitleStats.refresh(titles)
+        bump_version(Title)
+        if options['verbosity']:
+            self.stdout.write(
+                self.STATS_MESSAGE.format(count=titles.count())
+            )
+
+    def save_batch(self, batch, dry_run):
+        if dry_run or not batch:
+            return 0
+        with transaction.atomic():
+            Title.objects.bulk_update(
+                batch, ('rating_sum', 'rating_count', 'rating', 'changed_at')
+            )
+        bump_version(Title)
+        return len(batch)
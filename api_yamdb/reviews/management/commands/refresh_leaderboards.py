@@ -0,0 +1,32 @@
+"""Обновление топов произведений по категориям и жанрам
+(reviews.leaderboards). Запускается по расписанию: часто - без --full,
+чтобы пересобрать только группы с новыми оценками, и периодически
+с --full, чтобы учесть изменение средней оценки по всем отзывам."""
+
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    DONE_MESSAGE = 'Обновлено топов: {groups} за {seconds:.2f} с.'
+
+    help = 'Обновление топов произведений по категориям и жанрам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересобрать все топы, а не только измененные.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        groups = refresh_leaderboards(full=options['full'])
+        if options['verbosity']:
+            self.stdout.write(
+                self.DONE_MESSAGE.format(
+                    groups=groups, seconds=time.monotonic() - started
+                )
+            )
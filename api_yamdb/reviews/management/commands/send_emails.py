@@ -0,0 +1,121 @@
+"""Отправка писем из очереди OutboxEmail.
+Письма отправляются пачками через одно SMTP-соединение на весь
+накопившийся объем. Неудачные попытки повторяются с экспоненциальной
+задержкой, после --max-attempts письмо помечается как failed.
+Без --once команда работает как постоянный воркер."""
+
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from reviews.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    DONE_MESSAGE = 'Отправлено писем: {sent}, отложено: {retried}.'
+    UPDATE_FIELDS = (
+        'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'
+    )
+
+    help = 'Отправка писем из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить накопившиеся письма и завершиться.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Пауза между проверками пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько писем блокировать и отправлять за раз.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Число попыток, после которого письмо не отправляется.',
+        )
+        parser.add_argument(
+            '--retry-delay',
+            type=float,
+            default=30,
+            help='Задержка перед первым повтором, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, retried = self.send_backlog(options)
+            if sent or retried:
+                self.stdout.write(
+                    self.DONE_MESSAGE.format(sent=sent, retried=retried)
+                )
+            if options['once']:
+                return
+            if not sent and not retried:
+                time.sleep(options['interval'])
+
+    def send_backlog(self, options):
+        """Отправляет все готовые письма через одно соединение."""
+        sent = retried = 0
+        connection = None
+        try:
+            while True:
+                with transaction.atomic():
+                    batch = list(
+                        OutboxEmail.objects.select_for_update(
+                            skip_locked=True
+                        ).filter(
+                            status=OutboxEmail.PENDING,
+                            next_attempt_at__lte=timezone.now(),
+                        ).order_by('next_attempt_at')[:options['batch_size']]
+                    )
+                    if not batch:
+                        return sent, retried
+                    if connection is None:
+                        connection = get_connection(fail_silently=False)
+                    for email in batch:
+                        try:
+                            # open() держит соединение между письмами,
+                            # после сбоя переоткрывает его.
+                            connection.open()
+                            connection.send_messages([self.message(email)])
+                        except Exception as error:
+                            connection.close()
+                            self.schedule_retry(email, error, options)
+                            retried += 1
+                        else:
+                            email.status = OutboxEmail.SENT
+                            email.sent_at = timezone.now()
+                            email.attempts += 1
+                            sent += 1
+                    OutboxEmail.objects.bulk_update(batch, self.UPDATE_FIELDS)
+        finally:
+            if connection is not None:
+                connection.close()
+
+    @staticmethod
+    def message(email):
+        return EmailMessage(
+            email.subject, email.body, email.from_email, [email.recipient]
+        )
+
+    @staticmethod
+    def schedule_retry(email, error, options):
+        email.attempts += 1
+        email.last_error = str(error)
+        if email.attempts >= options['max_attempts']:
+            email.status = OutboxEmail.FAILED
+            return
+        delay = options['retry_delay'] * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
@@ -1,6 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F, Max,
+                              OuterRef, Q, Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from api_yamdb.settings import CONFIRMATION_CODE_LENGTH
 
@@ -95,14 +99,97 @@ class Title(models.Model):
     genre = models.ManyToManyField(
         Genre, related_name="titles", blank=False, verbose_name="жанр"
     )
+    rating_sum = models.PositiveIntegerField(
+        "Сумма оценок", default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        "Количество оценок", default=0, editable=False
+    )
+    rating = models.FloatField("Рейтинг", null=True, editable=False)
+    changed_at = models.DateTimeField(
+        "Изменено", auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        indexes = [
+            models.Index(
+                fields=["-rating", "name", "id"], name="title_rating_name_idx"
+            ),
+            models.Index(
+                fields=["year", "-rating", "name", "id"],
+                name="title_year_rating_idx",
+            ),
+            models.Index(
+                fields=["category", "-rating", "name", "id"],
+                name="title_category_rating_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Название - {self.name}"
 
+    @classmethod
+    def shift_rating(cls, title_id, score_delta, count_delta=0):
+        """
+        Атомарно сдвигает сумму и количество оценок произведения.
+        Рейтинг пересчитывается в том же UPDATE по новым значениям.
+        """
+        new_sum = F("rating_sum") + score_delta
+        new_count = F("rating_count") + count_delta
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            changed_at=timezone.now(),
+            rating=Case(
+                When(rating_count__lte=-count_delta, then=Value(None)),
+                default=ExpressionWrapper(
+                    new_sum * 1.0 / new_count, output_field=models.FloatField()
+                ),
+                output_field=models.FloatField(),
+            ),
+        )
+
+    @classmethod
+    def refresh_rating(cls, title_id):
+        """Пересчитывает рейтинг произведения по всем его отзывам."""
+        totals = Review.objects.filter(title_id=title_id).aggregate(
+            rating_sum=Sum("score"), rating_count=Count("pk")
+        )
+        rating_sum = totals["rating_sum"] or 0
+        rating_count = totals["rating_count"]
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_sum / rating_count if rating_count else None,
+            changed_at=timezone.now(),
+        )
+
+    @classmethod
+    def refresh_ratings(cls, queryset):
+        """Пересчитывает рейтинги всех произведений queryset одним UPDATE."""
+        reviews = Review.objects.filter(
+            title=OuterRef("pk")
+        ).order_by().values("title")
+
+        def total(aggregate, output_field):
+            return Subquery(
+                reviews.annotate(total=aggregate).values("total"),
+                output_field=output_field,
+            )
+
+        queryset.update(
+            rating_sum=Coalesce(
+                total(Sum("score"), models.IntegerField()), 0
+            ),
+            rating_count=Coalesce(
+                total(Count("pk"), models.IntegerField()), 0
+            ),
+            rating=total(Avg("score"), models.FloatField()),
+            changed_at=timezone.now(),
+        )
+
 
 class ReviewCommentModel(models.Model):
     """Базовый класс для моделей Review и Comment."""
@@ -153,6 +240,14 @@ class Review(ReviewCommentModel):
             score=self.score,
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные оценку и произведение для пересчета."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get("score")
+        instance._loaded_title_id = instance.__dict__.get("title_id")
+        return instance
+
     class Meta(ReviewCommentModel.Meta):
         default_related_name = "reviews"
         verbose_name = "Отзыв"
@@ -162,6 +257,194 @@ class Review(ReviewCommentModel):
                 fields=["author", "title"], name="author_title_connection"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
+
+
+class TitleStats(models.Model):
+    """
+    Статистика отзывов произведения: количество оценок каждого балла
+    и дата последнего отзыва. Обновляется сигналами отзывов
+    (reviews.signals), массовая загрузка пересчитывает ее через refresh.
+    """
+
+    SCORES = range(1, 11)
+    SCORE_FIELD = "score_{score}"
+    REFRESH_BATCH = 500
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="произведение",
+    )
+    score_1 = models.PositiveIntegerField("Оценок 1", default=0)
+    score_2 = models.PositiveIntegerField("Оценок 2", default=0)
+    score_3 = models.PositiveIntegerField("Оценок 3", default=0)
+    score_4 = models.PositiveIntegerField("Оценок 4", default=0)
+    score_5 = models.PositiveIntegerField("Оценок 5", default=0)
+    score_6 = models.PositiveIntegerField("Оценок 6", default=0)
+    score_7 = models.PositiveIntegerField("Оценок 7", default=0)
+    score_8 = models.PositiveIntegerField("Оценок 8", default=0)
+    score_9 = models.PositiveIntegerField("Оценок 9", default=0)
+    score_10 = models.PositiveIntegerField("Оценок 10", default=0)
+    last_review_date = models.DateTimeField(
+        "Дата последнего отзыва", null=True
+    )
+
+    class Meta:
+        verbose_name = "Статистика произведения"
+        verbose_name_plural = "Статистика произведений"
+
+    @classmethod
+    def score_field(cls, score):
+        return cls.SCORE_FIELD.format(score=score)
+
+    @property
+    def histogram(self):
+        """{балл: количество оценок} для баллов от 1 до 10."""
+        return {
+            score: getattr(self, self.score_field(score))
+            for score in self.SCORES
+        }
+
+    @classmethod
+    def add_review(cls, title_id, score, pub_date):
+        field = cls.score_field(score)
+        cls.objects.filter(pk=title_id).update(
+            **{field: F(field) + 1},
+            last_review_date=Case(
+                When(
+                    Q(last_review_date__isnull=True)
+                    | Q(last_review_date__lt=pub_date),
+                    then=Value(pub_date),
+                ),
+                default=F("last_review_date"),
+                output_field=models.DateTimeField(),
+            ),
+        )
+
+    @classmethod
+    def move_score(cls, title_id, old_score, new_score):
+        old_field = cls.score_field(old_score)
+        new_field = cls.score_field(new_score)
+        cls.objects.filter(pk=title_id).update(
+            **{old_field: F(old_field) - 1, new_field: F(new_field) + 1}
+        )
+
+    @classmethod
+    def remove_review(cls, title_id, score, pub_date):
+        """
+        Убирает оценку отзыва. Если удален последний отзыв, дата
+        берется из индекса review_title_pub_date_idx одним запросом.
+        """
+        field = cls.score_field(score)
+        latest = Review.objects.filter(title=OuterRef("pk")).order_by(
+            "-pub_date"
+        ).values("pub_date")[:1]
+        cls.objects.filter(pk=title_id).update(
+            **{field: F(field) - 1},
+            last_review_date=Case(
+                When(
+                    last_review_date__lte=pub_date,
+                    then=Subquery(latest, output_field=models.DateTimeField()),
+                ),
+                default=F("last_review_date"),
+                output_field=models.DateTimeField(),
+            ),
+        )
+
+    @classmethod
+    def for_title(cls, title_id):
+        """
+        Статистика произведения, созданного до появления TitleStats:
+        строка собирается по отзывам при первом обращении. Результат
+        не перечитывается: реплика может еще не получить новую строку.
+        """
+        using = router.db_for_write(cls)
+        (stats,) = cls.collect([title_id], using)
+        try:
+            with transaction.atomic(using=using):
+                stats.save(using=using, force_insert=True)
+        except IntegrityError:
+            # Строку уже создал параллельный запрос.
+            return cls.objects.using(using).get(pk=title_id)
+        return stats
+
+    @classmethod
+    def collect(cls, title_ids, using):
+        """
+        Несохраненные строки статистики title_ids. Отзывы читаются
+        из базы записи, чтобы отставание реплики не попало в счетчики.
+        """
+        totals = {
+            row.pop("title_id"): row
+            for row in Review.objects.using(using)
+            .filter(title_id__in=title_ids)
+            .order_by().values("title_id").annotate(
+                last_review_date=Max("pub_date"),
+                **{
+                    cls.score_field(score): Count(
+                        "pk", filter=Q(score=score)
+                    )
+                    for score in cls.SCORES
+                },
+            )
+        }
+        return [
+            cls(title_id=title_id, **totals.get(title_id, {}))
+            for title_id in title_ids
+        ]
+
+    @classmethod
+    def refresh(cls, titles):
+        """Пересчитывает статистику произведений titles по отзывам."""
+        using = router.db_for_write(cls)
+        title_ids = list(titles.order_by().values_list("pk", flat=True))
+        for start in range(0, len(title_ids), cls.REFRESH_BATCH):
+            batch = title_ids[start:start + cls.REFRESH_BATCH]
+            stats = cls.collect(batch, using)
+            with transaction.atomic(using=using):
+                cls.objects.using(using).filter(pk__in=batch).delete()
+                cls.objects.using(using).bulk_create(stats)
+
+
+class LeaderboardEntry(models.Model):
+    """Место произведения в топе категории или жанра (reviews.leaderboards)."""
+
+    CATEGORY = "category"
+    GENRE = "genre"
+    KINDS = (
+        (CATEGORY, "Категория"),
+        (GENRE, "Жанр"),
+    )
+
+    kind = models.CharField("Тип", max_length=8, choices=KINDS)
+    group_id = models.PositiveIntegerField("id категории или жанра")
+    position = models.PositiveSmallIntegerField("Место")
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+        verbose_name="произведение",
+    )
+    weighted_rating = models.FloatField("Взвешенный рейтинг")
+    refreshed_at = models.DateTimeField("Обновлено")
+
+    class Meta:
+        verbose_name = "Место в топе"
+        verbose_name_plural = "Топы произведений"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "group_id", "position"],
+                name="leaderboard_position",
+            )
+        ]
 
 
 class Comment(ReviewCommentModel):
@@ -192,3 +475,55 @@ class Comment(ReviewCommentModel):
         default_related_name = "comments"
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "-id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку (см. команду send_emails)."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "pending"),
+        (SENT, "sent"),
+        (FAILED, "failed"),
+    )
+
+    subject = models.CharField("Тема", max_length=255)
+    body = models.TextField("Текст")
+    from_email = models.CharField(
+        "Отправитель", max_length=254, null=True, blank=True
+    )
+    recipient = models.EmailField("Получатель", max_length=254)
+    status = models.CharField(
+        "Статус",
+        max_length=max(len(status) for status, _ in STATUSES),
+        default=PENDING,
+        choices=STATUSES,
+    )
+    attempts = models.PositiveSmallIntegerField("Попытки", default=0)
+    next_attempt_at = models.DateTimeField(
+        "Следующая попытка", default=timezone.now
+    )
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created = models.DateTimeField("Создано", auto_now_add=True)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Письмо"
+        verbose_name_plural = "Очередь писем"
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outbox_status_next_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.status})"
@@ -0,0 +1,123 @@
+"""Индексированный поиск произведений по названию.
+
+PostgreSQL: GIN-индекс pg_trgm по UPPER(name) обслуживает тот же
+UPPER(name) LIKE, который строит lookup icontains, а релевантность
+считается через similarity().
+SQLite: внешняя FTS5-таблица с токенизатором trigram, которая
+поддерживается триггерами. Запросы короче трех символов и базы без
+FTS5 обрабатываются обычным icontains.
+
+Индексы, таблица и триггеры создаются после каждой миграции
+(сигнал post_migrate), так как миграции в репозитории не хранятся.
+"""
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import DatabaseError, connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Title
+
+FTS_TABLE = "reviews_title_fts"
+MIN_FTS_QUERY_LENGTH = 3
+
+POSTGRESQL_SEARCH_SQL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS reviews_title_name_trgm "
+    "ON reviews_title USING gin (UPPER(name) gin_trgm_ops)",
+)
+
+SQLITE_SEARCH_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, content='reviews_title', content_rowid='id', "
+    "tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    "AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    "AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    "AFTER UPDATE OF name ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+_fts_available = {}
+
+
+class RawSubquery(RawSQL):
+    """RawSQL без внешних скобок: lookup __in добавляет их сам."""
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def install_title_search(sender, using="default", **kwargs):
+    """Создает поисковые индексы для базы using (post_migrate)."""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        statements = POSTGRESQL_SEARCH_SQL
+    elif connection.vendor == "sqlite":
+        statements = SQLITE_SEARCH_SQL
+    else:
+        return
+    try:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    except DatabaseError:
+        _fts_available[using] = False
+        return
+    _fts_available[using] = True
+
+
+def sqlite_fts_available(connection):
+    if connection.alias not in _fts_available:
+        _fts_available[connection.alias] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[connection.alias]
+
+
+def fts_phrase(query):
+    """Строка поиска как одна фраза FTS5, без операторов."""
+    return '"{}"'.format(query.replace('"', '""'))
+
+
+def search_titles(queryset, query):
+    """
+    Отбирает произведения, в названии которых есть query,
+    и сортирует их по релевантности, затем по прежнему порядку.
+    """
+    connection = connections[queryset.db]
+    ordering = queryset.query.order_by
+    if connection.vendor == "postgresql":
+        queryset = queryset.filter(name__icontains=query).annotate(
+            search_rank=TrigramSimilarity("name", query)
+        )
+    elif (
+        connection.vendor == "sqlite"
+        and len(query) >= MIN_FTS_QUERY_LENGTH
+        and sqlite_fts_available(connection)
+    ):
+        phrase = fts_phrase(query)
+        queryset = queryset.filter(
+            pk__in=RawSubquery(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                (phrase,),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"AND rowid = {Title._meta.db_table}.id",
+                (phrase,),
+                output_field=FloatField(),
+            )
+        )
+    else:
+        return queryset.filter(name__icontains=query)
+    return queryset.order_by("-search_rank", *ordering)
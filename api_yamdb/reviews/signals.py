@@ -0,0 +1,115 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (Category, Comment, Genre, Review, Title, TitleStats,
+                     User)
+from .versions import bump_version
+
+
+# Версии данных объявлены раньше пересчета рейтинга: он обновляет
+# _loaded_title_id, а здесь нужно прежнее произведение отзыва.
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_versions(sender, instance, **kwargs):
+    """Сбрасывает версии отзывов произведения и списка произведений."""
+    title_ids = {
+        instance.title_id, getattr(instance, "_loaded_title_id", None)
+    }
+    for title_id in title_ids - {None}:
+        bump_version(Review, title_id)
+    bump_version(Title)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новую или измененную оценку в рейтинге и статистике."""
+    if raw:
+        return
+    old_score = getattr(instance, "_loaded_score", None)
+    old_title_id = getattr(instance, "_loaded_title_id", None)
+    if created:
+        Title.shift_rating(instance.title_id, instance.score, 1)
+        TitleStats.add_review(
+            instance.title_id, instance.score, instance.pub_date
+        )
+    elif old_score is None:
+        Title.refresh_rating(instance.title_id)
+        TitleStats.refresh(Title.objects.filter(pk=instance.title_id))
+    elif old_title_id != instance.title_id:
+        Title.shift_rating(old_title_id, -old_score, -1)
+        Title.shift_rating(instance.title_id, instance.score, 1)
+        TitleStats.refresh(
+            Title.objects.filter(pk__in=(old_title_id, instance.title_id))
+        )
+    elif old_score != instance.score:
+        Title.shift_rating(instance.title_id, instance.score - old_score)
+        TitleStats.move_score(instance.title_id, old_score, instance.score)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+# Получатели post_delete отзыва отключают быстрое каскадное удаление
+# Django: при удалении произведения или пользователя отзывы удаляются
+# по одному, и для каждого выполняются UPDATE рейтинга и статистики.
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удаленного отзыва из рейтинга и статистики."""
+    Title.shift_rating(instance.title_id, -instance.score, -1)
+    TitleStats.remove_review(
+        instance.title_id, instance.score, instance.pub_date
+    )
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def bump_category_genre_version(sender, **kwargs):
+    """Сбрасывает кеши категорий и жанров и версию произведений."""
+    bump_version(sender)
+    bump_version(Title)
+
+
+@receiver(post_save, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_version(sender, **kwargs):
+    bump_version(Title)
+
+
+@receiver(post_delete, sender=Title)
+def bump_deleted_title_versions(sender, instance, **kwargs):
+    bump_version(Title)
+    bump_version(Review, instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def bump_deleted_review_comments(sender, instance, **kwargs):
+    bump_version(Comment, instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_version(sender, instance, **kwargs):
+    bump_version(Comment, instance.review_id)
+
+
+@receiver(post_save, sender=User)
+def bump_user_version(sender, instance, created, **kwargs):
+    """
+    Имена авторов входят в ответы по отзывам и комментариям,
+    а версия пользователя сбрасывает его кеш аутентификации.
+    """
+    if not created:
+        bump_version(User)
+        bump_version(User, instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def bump_deleted_user_version(sender, instance, **kwargs):
+    bump_version(User, instance.pk)
@@ -0,0 +1,51 @@
+"""Версии данных моделей для инвалидации кешей и условных запросов.
+Версия - строка "<время изменения>-<случайная часть>" в кеше Django,
+которая меняется при любом изменении данных. Версию можно вести
+для всей таблицы или для области (scope), например для отзывов
+одного произведения. Ключи кешей и ETag включают версию, поэтому
+после bump_version старые записи просто не совпадают."""
+
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+
+VERSION_KEY = "version:{label}:{scope}"
+
+
+def version_key(model, scope=None):
+    return VERSION_KEY.format(label=model._meta.label_lower, scope=scope)
+
+
+def new_version():
+    return f"{time.time():.6f}-{uuid4().hex}"
+
+
+def get_version(model, scope=None):
+    """Текущая версия данных модели (или ее области scope)."""
+    key = version_key(model, scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(*pairs):
+    """Версии для нескольких пар (модель, scope) одним запросом к кешу."""
+    keys = [version_key(model, scope) for model, scope in pairs]
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else get_version(model, scope)
+        for key, (model, scope) in zip(keys, pairs)
+    ]
+
+
+def bump_version(model, scope=None):
+    """Меняет версию данных модели, делая устаревшими все кеши по ней."""
+    cache.set(version_key(model, scope), new_version(), None)
+
+
+def version_timestamp(version):
+    """Время изменения, записанное в версии, в секундах."""
+    return float(version.split("-", 1)[0])